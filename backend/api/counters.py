@@ -0,0 +1,104 @@
+"""
+Денормализованные счётчики.
+
+Каждый счётчик — столбец модели target, равный числу строк source,
+ссылающихся на объект через foreign_key. Обработчики post_save и
+post_delete меняют столбец одним UPDATE ... SET x = x ± 1, поэтому
+параллельные запросы не теряют изменения; уменьшение не опускает
+счётчик ниже нуля, а save() моделей счётчики не перезаписывает
+(backend.db.CounterFieldsMixin). Массовые операции
+(bulk_create) сигналов не отправляют и должны вызывать
+add_created() сами. reconcile() пересчитывает столбцы по исходным таблицам.
+"""
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+
+from favorites.models import FavoritesRecipes
+from recipes.models import Recipe
+from shopper.models import ShopRecipes
+from subs.models import Subscriber
+
+User = get_user_model()
+
+COUNTERS = (
+    (FavoritesRecipes, 'recipes', Recipe, 'favorites_count'),
+    (ShopRecipes, 'recipes', Recipe, 'in_cart_count'),
+    (Recipe, 'author', User, 'recipes_count'),
+    (Subscriber, 'subscriptions', User, 'subscribers_count'),
+)
+
+
+def change(target, pks, counter, delta):
+    return target.objects.filter(pk__in=pks).update(
+        **{counter: Greatest(F(counter) + delta, 0)}
+    )
+
+
+def add_created(source, instances):
+    """
+    Увеличивает счётчики после bulk_create строк source: один UPDATE
+    на каждое различное приращение.
+    """
+    for model, foreign_key, target, counter in COUNTERS:
+        if model is not source:
+            continue
+        totals = Counter(
+            getattr(instance, f'{foreign_key}_id') for instance in instances
+        )
+        by_delta = defaultdict(list)
+        for pk, total in totals.items():
+            by_delta[total].append(pk)
+        for delta, pks in by_delta.items():
+            change(target, pks, counter, delta)
+
+
+def _added(foreign_key, target, counter, instance, created, raw, **kwargs):
+    if created and not raw:
+        change(target, (getattr(instance, f'{foreign_key}_id'),), counter, 1)
+
+
+def _removed(foreign_key, target, counter, instance, raw=False, **kwargs):
+    if not raw:
+        change(target, (getattr(instance, f'{foreign_key}_id'),), counter, -1)
+
+
+def connect():
+    for source, foreign_key, target, counter in COUNTERS:
+        uid = f'counter:{target.__name__}.{counter}'
+        post_save.connect(
+            partial(_added, foreign_key, target, counter),
+            sender=source, weak=False, dispatch_uid=uid
+        )
+        post_delete.connect(
+            partial(_removed, foreign_key, target, counter),
+            sender=source, weak=False, dispatch_uid=uid
+        )
+
+
+def reconcile(batch_size=1000):
+    """
+    Сверяет счётчики с исходными таблицами и исправляет расхождения.
+
+    Возвращает {'Модель.поле': число исправленных строк}.
+    """
+    fixed = {}
+    for source, foreign_key, target, counter in COUNTERS:
+        actual = Coalesce(Subquery(
+            source.objects.filter(**{foreign_key: OuterRef('pk')})
+            .order_by().values(foreign_key)
+            .annotate(total=Count('pk')).values('total')
+        ), 0)
+        wrong = [
+            target(pk=pk, **{counter: total})
+            for pk, total in target.objects.annotate(actual=actual)
+            .exclude(**{counter: F('actual')})
+            .values_list('pk', 'actual').iterator()
+        ]
+        target.objects.bulk_update(wrong, (counter,), batch_size=batch_size)
+        fixed[f'{target.__name__}.{counter}'] = len(wrong)
+    return fixed
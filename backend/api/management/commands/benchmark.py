@@ -0,0 +1,200 @@
+import json
+import math
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.v1.serializers import (
+    ReadRecipeSerializer,
+    UserWithoutAuthorSerializer
+)
+from api.v1.views import RecipeViewSet
+from backend.middleware import QueryStats
+from recipes.models import Ingredient, Recipe, Tag
+from shopper.models import ShopRecipes
+
+User = get_user_model()
+
+DEEP_PAGE = 50
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(share * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа основных эндпоинтов и сериализаторов '
+        'и число SQL-запросов. Запускать на базе, заполненной seed_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Сколько первых прогонов каждого замера не учитывать'
+        )
+        parser.add_argument(
+            '--user', type=int,
+            help='id пользователя, от имени которого идут запросы'
+        )
+        parser.add_argument(
+            '--only', default='',
+            help='Запускать только замеры, в имени которых есть подстрока'
+        )
+        parser.add_argument(
+            '--cache', action='store_true',
+            help=(
+                'Использовать настроенный кеш. По умолчанию кеш отключён, '
+                'чтобы замерять запросы к базе, а не попадания в кеш'
+            )
+        )
+        parser.add_argument(
+            '--json', dest='json_path',
+            help='Сохранить результаты в JSON для сравнения прогонов'
+        )
+
+    def get_user(self, user_id):
+        if user_id is None:
+            user_id = ShopRecipes.objects.filter(
+                user__subscriber__isnull=False
+            ).values_list('user_id', flat=True).first()
+        user = User.objects.filter(id=user_id).first()
+        if user is None:
+            raise CommandError(
+                'Нет пользователя с корзиной и подписками: '
+                'заполните базу командой seed_data или передайте --user.'
+            )
+        return user
+
+    def get_cases(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        recipe = Recipe.objects.order_by('-created_at', '-id').first()
+        tags = '&'.join(
+            f'tags={slug}'
+            for slug in Tag.objects.values_list('slug', flat=True)[:2]
+        )
+        ingredient = Ingredient.objects.values_list('name', flat=True).first()
+        if recipe is None or ingredient is None:
+            raise CommandError('В базе нет рецептов или ингредиентов.')
+        # Дальняя страница списка: 50-я или последняя на маленькой базе.
+        deep_page = min(DEEP_PAGE, math.ceil(Recipe.objects.count() / 6))
+        urls = {
+            'recipes.list': '/api/recipes/?limit=6',
+            'recipes.list.deep_page': (
+                f'/api/recipes/?limit=6&page={deep_page}'
+            ),
+            'recipes.list.filtered': (
+                f'/api/recipes/?limit=6&{tags}&is_favorited=1'
+            ),
+            'recipes.list.author': (
+                f'/api/recipes/?limit=6&author={recipe.author_id}'
+            ),
+            'recipes.detail': f'/api/recipes/{recipe.id}/',
+            'recipes.feed': '/api/recipes/feed/?limit=6',
+            'recipes.download_shopping_cart': (
+                '/api/recipes/download_shopping_cart/'
+            ),
+            'users.subscriptions': (
+                '/api/users/subscriptions/?limit=6&recipes_limit=3'
+            ),
+            'ingredients.search': f'/api/ingredients/?name={ingredient[:3]}',
+        }
+        cases = {
+            name: (lambda url=url: self.fetch(client, url))
+            for name, url in urls.items()
+        }
+
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        context = {'request': request}
+        view = RecipeViewSet(
+            request=request, action='list', format_kwarg=None, kwargs={}
+        )
+        recipes = list(view.get_queryset()[:6])
+        authors = UserWithoutAuthorSerializer.prefetch_recipes(
+            list(UserWithoutAuthorSerializer.get_queryset(user)[:6]), request
+        )
+        cases['serializers.recipes'] = lambda: ReadRecipeSerializer(
+            recipes, many=True, context=context
+        ).data
+        cases['serializers.subscriptions'] = (
+            lambda: UserWithoutAuthorSerializer(
+                authors, many=True, context=context
+            ).data
+        )
+        return cases
+
+    @staticmethod
+    def fetch(client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url}: ответ {response.status_code}')
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def measure(self, case, iterations, warmup):
+        timings = []
+        queries = []
+        for number in range(warmup + iterations):
+            stats = QueryStats()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                started = time.perf_counter()
+                case()
+                elapsed = time.perf_counter() - started
+            if number >= warmup:
+                timings.append(elapsed * 1000)
+                queries.append(stats.count)
+        return {
+            'p50': percentile(timings, 0.5),
+            'p95': percentile(timings, 0.95),
+            'queries': max(queries),
+        }
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля.')
+        results = {}
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ))
+            if not options['cache']:
+                stack.enter_context(override_settings(CACHES=DUMMY_CACHES))
+            user = self.get_user(options['user'])
+            self.stdout.write(f'Пользователь {user.id} ({user.email})')
+            cases = self.get_cases(user)
+            for name, case in cases.items():
+                if options['only'] not in name:
+                    continue
+                results[name] = result = self.measure(
+                    case, options['iterations'], options['warmup']
+                )
+                self.stdout.write(
+                    f'{name:<34} p50 {result["p50"]:8.2f} мс  '
+                    f'p95 {result["p95"]:8.2f} мс  '
+                    f'запросов {result["queries"]}'
+                )
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'database': connections['default'].vendor,
+                    'iterations': options['iterations'],
+                    'cache': options['cache'],
+                    'results': results,
+                }, file, indent=2)
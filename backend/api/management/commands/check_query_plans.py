@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from favorites.models import FavoritesRecipes
+from jobs.models import Job
+from recipes.models import Recipe
+from shopper.models import ShopIngredients, ShopRecipes
+from subs.models import FeedEntry, Subscriber
+
+User = get_user_model()
+
+
+def get_checks(user_id, recipe_id):
+    """
+    Горячие запросы API и индексы, которыми они должны читаться.
+
+    Если подходит любой из нескольких индексов, они перечислены кортежем.
+    """
+    return (
+        (
+            'рецепт в избранном',
+            FavoritesRecipes.objects.filter(
+                user_id=user_id, recipes_id=recipe_id
+            ),
+            'favorites_recipes_unique'
+        ),
+        (
+            'рецепт в корзине',
+            ShopRecipes.objects.filter(user_id=user_id, recipes_id=recipe_id),
+            'shop_recipes_unique'
+        ),
+        (
+            'подписки пользователя',
+            Subscriber.objects.filter(user_id=user_id).order_by(),
+            'unique_subscription'
+        ),
+        (
+            'подписчики автора',
+            Subscriber.objects.filter(subscriptions_id=user_id)
+            .order_by().values_list('user_id'),
+            'subscriber_author_user_idx'
+        ),
+        (
+            'лента рецептов',
+            Recipe.objects.order_by('-created_at', '-id')[:6],
+            'recipe_created_at_id_idx'
+        ),
+        (
+            'рецепты автора',
+            Recipe.objects.filter(author_id=user_id)
+            .order_by('-created_at', '-id')[:6],
+            'recipe_author_created_idx'
+        ),
+        (
+            'лента подписок',
+            FeedEntry.objects.filter(user_id=user_id)[:6],
+            'feed_entry_user_created_idx'
+        ),
+        (
+            'список покупок',
+            ShopIngredients.objects.filter(user_id=user_id).order_by(),
+            ('shop_ingredients_unique', 'shopper_shopingredients_user_id')
+        ),
+        (
+            'очередь задач',
+            Job.objects.filter(status=Job.PENDING, run_at__lte=timezone.now())
+            .order_by('run_at', 'id')[:1],
+            'job_status_run_at_idx'
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет через EXPLAIN, что горячие запросы читаются '
+        'по индексам. Запускать на заполненной базе PostgreSQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--allow-seqscan', action='store_true',
+            help=(
+                'Не запрещать планировщику полный просмотр таблиц. '
+                'По умолчанию запрещён, чтобы на небольшой базе '
+                'проверялась пригодность индексов, а не их выгодность'
+            )
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Печатать планы целиком'
+        )
+
+    def uses_index(self, plan, index_names):
+        for name in index_names:
+            if name in plan:
+                return True
+            # SQLite называет индексы ограничений уникальности по-своему.
+            if (
+                connection.vendor == 'sqlite'
+                and 'sqlite_autoindex' in plan
+                and 'unique' in name
+            ):
+                return True
+        return False
+
+    def handle(self, *args, **options):
+        user_id = User.objects.values_list('id', flat=True).first() or 0
+        recipe_id = Recipe.objects.values_list('id', flat=True).first() or 0
+        failed = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql' and not options[
+                'allow_seqscan'
+            ]:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for label, queryset, index_names in get_checks(
+                user_id, recipe_id
+            ):
+                if isinstance(index_names, str):
+                    index_names = (index_names,)
+                plan = queryset.explain()
+                if self.uses_index(plan, index_names):
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{label}: {", ".join(index_names)}'
+                    ))
+                else:
+                    failed.append(label)
+                    self.stdout.write(self.style.ERROR(
+                        f'{label}: нет {", ".join(index_names)}'
+                    ))
+                if options['verbose_plans']:
+                    self.stdout.write(plan)
+        if failed:
+            raise CommandError(
+                f'Запросы без ожидаемых индексов: {", ".join(failed)}'
+            )
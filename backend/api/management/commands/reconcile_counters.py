@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api import counters
+
+
+class Command(BaseCommand):
+    help = 'Сверяет денормализованные счётчики с исходными таблицами.'
+
+    def handle(self, *args, **options):
+        for name, fixed in counters.reconcile().items():
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: исправлено строк {fixed}'
+            ))
@@ -0,0 +1,250 @@
+import io
+import random
+import time
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+
+from api import counters
+from backend.constants import AMOUNT_MAX, FEED_BACKFILL_LIMIT
+from backend.versions import bump
+from favorites.models import FavoritesRecipes
+from recipes import snapshots
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from shopper.models import ShopIngredients, ShopRecipes
+from subs.models import FeedEntry, Subscriber
+
+User = get_user_model()
+
+IMAGE_NAME = 'recipes/seed.jpg'
+UNITS = ('г', 'кг', 'мл', 'л', 'шт.', 'ст. л.', 'ч. л.', 'по вкусу')
+WORDS = (
+    'томатный', 'сливочный', 'домашний', 'острый', 'летний', 'пряный',
+    'суп', 'салат', 'пирог', 'соус', 'рагу', 'омлет', 'паста', 'каша',
+    'с курицей', 'с грибами', 'с сыром', 'с овощами', 'с рисом',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет пустую базу синтетическими данными для нагрузочных '
+        'замеров: пользователи, рецепты, ингредиенты, избранное, корзины '
+        'и подписки. При одном --seed данные всегда одинаковые.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument(
+            '--ingredients', type=int, default=2000,
+            help='Сколько ингредиентов создать, если их нет в базе'
+        )
+        parser.add_argument(
+            '--recipe-ingredients', type=int, default=8,
+            help='Наибольшее число ингредиентов в рецепте'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=30,
+            help='Рецептов в избранном у пользователя'
+        )
+        parser.add_argument(
+            '--cart', type=int, default=5,
+            help='Рецептов в корзине у пользователя'
+        )
+        parser.add_argument(
+            '--subscriptions', type=int, default=20,
+            help='Подписок у пользователя'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument(
+            '--password', default='seed-password',
+            help='Пароль всех созданных пользователей'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f'Пользователи {prefix}_* уже есть: очистите базу '
+                '(manage.py flush) или задайте другой --prefix.'
+            )
+        if options['users'] < 2 or options['recipes'] < 1:
+            raise CommandError('Нужно хотя бы 2 пользователя и 1 рецепт.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.monotonic()
+        with transaction.atomic():
+            tag_ids = self.create_tags(options['tags'])
+            ingredient_ids = self.create_ingredients(options['ingredients'])
+            user_ids = self.create_users(
+                prefix, options['users'], options['password']
+            )
+            recipes = self.create_recipes(
+                user_ids, options['recipes'], tag_ids, ingredient_ids,
+                options['recipe_ingredients']
+            )
+            recipe_ids = [recipe_id for recipe_id, _, _ in recipes]
+            self.create_relations(
+                FavoritesRecipes, 'recipes', user_ids, recipe_ids,
+                options['favorites']
+            )
+            self.create_relations(
+                ShopRecipes, 'recipes', user_ids, recipe_ids, options['cart']
+            )
+            subscriptions = self.create_relations(
+                Subscriber, 'subscriptions', user_ids, user_ids,
+                options['subscriptions']
+            )
+            self.fill_feeds(subscriptions, recipes)
+            ShopIngredients.objects.rebuild(user_ids=user_ids)
+            counters.reconcile()
+        bump('recipes', 'users', 'authors', 'tags', 'ingredients')
+        snapshots.schedule('tags')
+        snapshots.schedule('ingredients')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с. '
+            f'Пользователи {prefix}_0…{prefix}_{len(user_ids) - 1}, '
+            f'пароль {options["password"]}'
+        ))
+
+    def bulk_create(self, model, objects, label=None):
+        model.objects.bulk_create(
+            objects, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        self.stdout.write(
+            f'{label or model._meta.verbose_name_plural}: {len(objects)}'
+        )
+
+    def create_tags(self, total):
+        self.bulk_create(Tag, [
+            Tag(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(total)
+        ])
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def create_ingredients(self, total):
+        if not Ingredient.objects.exists():
+            self.bulk_create(Ingredient, [
+                Ingredient(
+                    name=f'{self.rng.choice(WORDS)} ингредиент {number}',
+                    measurement_unit=self.rng.choice(UNITS)
+                )
+                for number in range(total)
+            ])
+        return list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def create_users(self, prefix, total, password):
+        password = make_password(password)
+        self.bulk_create(User, [
+            User(
+                username=f'{prefix}_{number}',
+                email=f'{prefix}_{number}@example.com',
+                first_name=f'Имя{number}',
+                last_name=f'Фамилия{number}',
+                password=password
+            )
+            for number in range(total)
+        ])
+        return list(
+            User.objects.filter(username__startswith=f'{prefix}_')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_image(self):
+        if default_storage.exists(IMAGE_NAME):
+            return IMAGE_NAME
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 800), (230, 180, 120)).save(buffer, 'JPEG')
+        return default_storage.save(
+            IMAGE_NAME, ContentFile(buffer.getvalue())
+        )
+
+    def create_recipes(self, user_ids, total, tag_ids, ingredient_ids,
+                       max_ingredients):
+        """Возвращает [(id, id автора, дата)] в порядке создания."""
+        image = self.create_image()
+        rng = self.rng
+        existing = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        self.bulk_create(Recipe, [
+            Recipe(
+                author_id=rng.choice(user_ids),
+                name=' '.join(rng.sample(WORDS, 3)).capitalize(),
+                text=' '.join(rng.choices(WORDS, k=40)),
+                cooking_time=rng.randint(5, 180),
+                image=image
+            )
+            for _ in range(total)
+        ])
+        recipes = list(
+            Recipe.objects.filter(id__gt=existing, author_id__in=user_ids)
+            .order_by('id').values_list('id', 'author_id', 'created_at')
+        )
+        tags = []
+        links = []
+        for recipe_id, _, _ in recipes:
+            tags.extend(
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+                for tag_id in rng.sample(
+                    tag_ids, rng.randint(1, min(3, len(tag_ids)))
+                )
+            )
+            links.extend(
+                RecipeIngredient(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=rng.randint(1, min(AMOUNT_MAX, 1000))
+                )
+                for ingredient_id in rng.sample(
+                    ingredient_ids,
+                    rng.randint(1, min(max_ingredients, len(ingredient_ids)))
+                )
+            )
+        self.bulk_create(Recipe.tags.through, tags, 'Теги рецептов')
+        self.bulk_create(RecipeIngredient, links)
+        return recipes
+
+    def create_relations(self, model, field, user_ids, target_ids, per_user):
+        """Связывает каждого пользователя с per_user случайными объектами."""
+        relations = defaultdict(list)
+        objects = []
+        for user_id in user_ids:
+            candidates = self.rng.sample(
+                target_ids, min(per_user + 1, len(target_ids))
+            )
+            if model is Subscriber:
+                candidates = [pk for pk in candidates if pk != user_id]
+            for target_id in candidates[:per_user]:
+                relations[user_id].append(target_id)
+                objects.append(
+                    model(user_id=user_id, **{f'{field}_id': target_id})
+                )
+        self.bulk_create(model, objects)
+        return relations
+
+    def fill_feeds(self, subscriptions, recipes):
+        by_author = defaultdict(list)
+        for recipe_id, author_id, created_at in reversed(recipes):
+            by_author[author_id].append((recipe_id, created_at))
+        self.bulk_create(FeedEntry, [
+            FeedEntry(
+                user_id=user_id, recipe_id=recipe_id, created_at=created_at
+            )
+            for user_id, author_ids in subscriptions.items()
+            for author_id in author_ids
+            for recipe_id, created_at in (
+                by_author[author_id][:FEED_BACKFILL_LIMIT]
+            )
+        ])
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Version',
+            fields=[
+                ('scope', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Область')),
+                ('value', models.FloatField(verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'версия данных',
+                'verbose_name_plural': 'Версии данных',
+            },
+        ),
+    ]
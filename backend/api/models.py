@@ -0,0 +1,24 @@
+from django.db import models
+
+from backend.constants import VERSION_SCOPE_MAX_LENGTH
+
+
+class Version(models.Model):
+    """
+    Версия области данных для инвалидации кешей (см. backend.versions).
+
+    Хранится в базе, а не в кеше процесса, чтобы изменения из воркера
+    задач, команд manage.py и других процессов gunicorn сразу меняли
+    ключи кешей и ETag во всех процессах.
+    """
+    scope = models.CharField(
+        'Область', max_length=VERSION_SCOPE_MAX_LENGTH, primary_key=True
+    )
+    value = models.FloatField('Время изменения')
+
+    class Meta:
+        verbose_name = 'версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.scope}: {self.value}'
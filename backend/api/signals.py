@@ -0,0 +1,114 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save
+)
+from django.dispatch import receiver
+
+from backend.versions import bump
+from favorites.models import FavoritesRecipes
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from shopper.models import ShopRecipes
+from subs.models import Subscriber
+
+User = get_user_model()
+
+# Поля автора, которые попадают в ответы с рецептами.
+AUTHOR_FIELDS = (
+    'email', 'username', 'first_name', 'last_name', 'avatar',
+    'avatar_variants',
+)
+
+
+def bump_on_commit(*scopes):
+    transaction.on_commit(partial(bump, *scopes))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def recipe_changed(instance, **kwargs):
+    bump_on_commit('recipes', f'recipe:{instance.pk}')
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=RecipeIngredient)
+def recipe_relations_changed(instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_on_commit('recipes', f'recipe:{instance.pk}')
+    elif pk_set:
+        bump_on_commit('recipes', *(f'recipe:{pk}' for pk in pk_set))
+    else:
+        bump_on_commit('recipes', 'tags', 'ingredients')
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def recipe_ingredient_changed(instance, **kwargs):
+    bump_on_commit('recipes', f'recipe:{instance.recipe_id}')
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(**kwargs):
+    bump_on_commit('tags')
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_changed(**kwargs):
+    bump_on_commit('ingredients')
+
+
+@receiver((post_save, post_delete), sender=FavoritesRecipes)
+def favorite_changed(instance, **kwargs):
+    bump_on_commit(f'favorites:{instance.user_id}')
+
+
+@receiver((post_save, post_delete), sender=ShopRecipes)
+def shopping_cart_changed(instance, **kwargs):
+    bump_on_commit(f'cart:{instance.user_id}')
+
+
+@receiver((post_save, post_delete), sender=Subscriber)
+def subscription_changed(instance, **kwargs):
+    bump_on_commit(f'subscriptions:{instance.user_id}')
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_on_commit('users')
+
+
+def get_author_values(instance):
+    # Через __dict__, чтобы не загружать отложенные поля.
+    values = {}
+    for name in AUTHOR_FIELDS:
+        value = instance.__dict__.get(name)
+        values[name] = getattr(value, 'name', value)
+    return values
+
+
+@receiver(post_init, sender=User)
+def remember_author_values(instance, **kwargs):
+    instance._author_values = get_author_values(instance)
+
+
+@receiver(post_save, sender=User)
+def author_changed(instance, created, raw, **kwargs):
+    """
+    Сбрасывает кеши рецептов, только если у автора рецептов
+    поменялись поля, которые видны в рецептах.
+    """
+    values = get_author_values(instance)
+    changed = values != instance._author_values
+    instance._author_values = values
+    if (
+        changed and not created and not raw
+        and Recipe.objects.filter(author=instance).exists()
+    ):
+        bump_on_commit('authors')
@@ -0,0 +1,7 @@
+from jobs.registry import task
+from . import counters
+
+
+@task(every=60 * 60 * 24)
+def reconcile_counters():
+    counters.reconcile()
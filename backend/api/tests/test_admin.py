@@ -0,0 +1,87 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from favorites.models import FavoritesRecipes
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from shopper.models import ShopRecipes
+from subs.models import Subscriber
+
+User = get_user_model()
+
+CHANGE_LISTS = (
+    'users/profile',
+    'recipes/recipe',
+    'recipes/ingredient',
+    'recipes/recipeingredient',
+    'favorites/favoritesrecipes',
+    'shopper/shoprecipes',
+    'subs/subscriber',
+)
+
+
+def count_queries(response):
+    return int(re.search(r'"(\d+) queries"', response['Server-Timing'])[1])
+
+
+class AdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com', username='admin',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        self.ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        self.client.force_login(self.admin)
+        self.create_rows('first')
+
+    def create_rows(self, name):
+        author = User.objects.create_user(
+            email=f'{name}@example.com', username=name,
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        recipe = Recipe.objects.create(
+            author=author, name='Рецепт', text='Текст ' * 100,
+            cooking_time=5
+        )
+        recipe.tags.set((self.tag,))
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=self.ingredient, amount=100
+        )
+        FavoritesRecipes.objects.create(user=self.admin, recipes=recipe)
+        ShopRecipes.objects.create(user=self.admin, recipes=recipe)
+        Subscriber.objects.create(user=self.admin, subscriptions=author)
+        return recipe
+
+    def get_query_counts(self):
+        counts = {}
+        for change_list in CHANGE_LISTS:
+            response = self.client.get(f'/admin/{change_list}/')
+            self.assertEqual(response.status_code, 200, change_list)
+            counts[change_list] = count_queries(response)
+        return counts
+
+    def test_change_lists_do_not_grow(self):
+        counts = self.get_query_counts()
+        for number in range(3):
+            self.create_rows(f'author{number}')
+        self.assertEqual(self.get_query_counts(), counts)
+
+    def test_recipe_change_list_truncates_text(self):
+        response = self.client.get('/admin/recipes/recipe/')
+        self.assertContains(response, 'Текст Текст')
+        self.assertNotContains(response, 'Текст ' * 100)
+
+    def test_recipe_change_form_uses_autocomplete(self):
+        recipe = self.create_rows('second')
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        response = self.client.get(
+            f'/admin/recipes/recipe/{recipe.id}/change/'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Ингредиент: мука (г)')
+        self.assertNotContains(response, 'Ингредиент: соль (г)')
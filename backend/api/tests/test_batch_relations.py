@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from favorites.models import FavoritesRecipes
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from shopper.models import ShopIngredients
+from subs.models import Subscriber
+
+User = get_user_model()
+
+FAVORITE_URL = '/api/recipes/favorite/batch/'
+CART_URL = '/api/recipes/shopping_cart/batch/'
+SUBSCRIBE_URL = '/api/users/subscribe/batch/'
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+class BatchRelationsTest(TestCase):
+
+    def setUp(self):
+        self.user = create_user('user')
+        self.author = create_user('author')
+        flour = Ingredient.objects.create(name='мука', measurement_unit='г')
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.author, name=f'Рецепт {number}', text='Текст',
+                cooking_time=5
+            )
+            for number in range(3)
+        ]
+        for recipe in self.recipes:
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=flour, amount=100
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, url, ids, method='post'):
+        response = getattr(self.client, method)(
+            url, {'ids': ids}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return {
+            item['id']: item['status'] for item in response.json()['results']
+        }
+
+    def test_add_and_remove_favorites(self):
+        first, second, _ = (recipe.id for recipe in self.recipes)
+        unknown = 10 ** 6
+        FavoritesRecipes.objects.create(user=self.user, recipes_id=first)
+        self.assertEqual(
+            self.batch(FAVORITE_URL, [first, second, unknown]),
+            {first: 'exists', second: 'added', unknown: 'not_found'}
+        )
+        self.assertEqual(Recipe.objects.get(pk=second).favorites_count, 1)
+        self.assertEqual(
+            self.batch(FAVORITE_URL, [second, unknown], method='delete'),
+            {second: 'removed', unknown: 'not_found'}
+        )
+        self.assertEqual(Recipe.objects.get(pk=second).favorites_count, 0)
+        self.assertEqual(
+            self.batch(FAVORITE_URL, [second], method='delete'),
+            {second: 'missing'}
+        )
+
+    def test_shopping_cart_updates_shopping_list(self):
+        self.batch(CART_URL, [recipe.id for recipe in self.recipes])
+        self.assertEqual(
+            ShopIngredients.objects.get(user=self.user).amount, 300
+        )
+        self.batch(CART_URL, [self.recipes[0].id], method='delete')
+        self.assertEqual(
+            ShopIngredients.objects.get(user=self.user).amount, 200
+        )
+
+    def test_subscribe(self):
+        self.assertEqual(
+            self.batch(SUBSCRIBE_URL, [self.author.id, self.user.id]),
+            {self.author.id: 'added', self.user.id: 'invalid'}
+        )
+        self.assertTrue(Subscriber.objects.filter(
+            user=self.user, subscriptions=self.author
+        ).exists())
+
+    def test_concurrent_insert(self):
+        recipe = self.recipes[0]
+        bulk_create = FavoritesRecipes.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # Параллельный запрос успел добавить ту же связь.
+            FavoritesRecipes.objects.create(user=self.user, recipes=recipe)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(
+            FavoritesRecipes.objects, 'bulk_create', racing_bulk_create
+        ):
+            self.assertEqual(
+                self.batch(FAVORITE_URL, [recipe.id]), {recipe.id: 'added'}
+            )
+        self.assertEqual(
+            FavoritesRecipes.objects.filter(user=self.user).count(), 1
+        )
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api import counters
+from favorites.models import FavoritesRecipes
+from recipes.models import Recipe
+from shopper.models import ShopIngredients, ShopRecipes
+from subs.models import Subscriber
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SeedDataBenchmarkTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'seed_data', users=6, recipes=30, tags=3, ingredients=40,
+            favorites=4, cart=2, subscriptions=2, stdout=StringIO()
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_seed_data(self):
+        self.assertEqual(
+            User.objects.filter(username__startswith='seed_').count(), 6
+        )
+        self.assertEqual(Recipe.objects.count(), 30)
+        self.assertEqual(FavoritesRecipes.objects.count(), 6 * 4)
+        self.assertEqual(ShopRecipes.objects.count(), 6 * 2)
+        self.assertEqual(Subscriber.objects.count(), 6 * 2)
+        self.assertEqual(
+            set(counters.reconcile().values()), {0},
+            'seed_data оставил неверные счётчики'
+        )
+        shopping_lists = set(ShopIngredients.objects.values_list(
+            'user_id', 'ingredient_id', 'amount'
+        ))
+        ShopIngredients.objects.rebuild()
+        self.assertEqual(
+            set(ShopIngredients.objects.values_list(
+                'user_id', 'ingredient_id', 'amount'
+            )),
+            shopping_lists
+        )
+
+    def test_benchmark(self):
+        path = os.path.join(MEDIA_ROOT, 'benchmark.json')
+        output = StringIO()
+        call_command(
+            'benchmark', iterations=2, warmup=0, json_path=path,
+            stdout=output
+        )
+        with open(path, encoding='utf-8') as file:
+            report = json.load(file)
+        results = report['results']
+        self.assertIn('recipes.list', results)
+        self.assertIn('recipes.download_shopping_cart', results)
+        self.assertIn('serializers.subscriptions', results)
+        for name, result in results.items():
+            with self.subTest(name):
+                self.assertIn(name, output.getvalue())
+                self.assertGreaterEqual(result['p95'], result['p50'])
+                self.assertGreaterEqual(result['queries'], 0)
+        self.assertGreater(results['recipes.list']['queries'], 0)
+        self.assertGreater(
+            results['recipes.download_shopping_cart']['queries'], 0
+        )
@@ -0,0 +1,40 @@
+from time import time
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Version
+from recipes.models import Tag
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        Tag.objects.create(name='Завтрак', slug='breakfast')
+
+    def get_etag(self):
+        response = self.client.get('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_not_modified(self):
+        etag = self.get_etag()
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_in_another_process_invalidates_etag(self):
+        etag = self.get_etag()
+        # Воркер или команда manage.py пишут версию в ту же таблицу.
+        Version.objects.create(scope='tags', value=time())
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_orm_change_invalidates_etag(self):
+        etag = self.get_etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Ужин', slug='dinner')
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
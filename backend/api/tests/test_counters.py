@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from api import counters
+from favorites.models import FavoritesRecipes
+from recipes.models import Recipe
+from subs.models import Subscriber
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.reader = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='Рецепт', text='Текст', cooking_time=5
+        )
+
+    def test_full_save_keeps_counters(self):
+        stale_recipe = Recipe.objects.get(pk=self.recipe.pk)
+        stale_author = User.objects.get(pk=self.author.pk)
+        FavoritesRecipes.objects.create(user=self.reader, recipes=self.recipe)
+        Subscriber.objects.create(
+            user=self.reader, subscriptions=self.author
+        )
+        stale_recipe.name = 'Новое название'
+        stale_recipe.save()
+        stale_author.first_name = 'Новое имя'
+        stale_author.save()
+        self.recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(self.recipe.name, 'Новое название')
+        self.assertEqual(self.recipe.favorites_count, 1)
+        self.assertEqual(self.author.first_name, 'Новое имя')
+        self.assertEqual(self.author.subscribers_count, 1)
+        self.assertEqual(self.author.recipes_count, 1)
+
+    def test_update_fields_skip_counters(self):
+        FavoritesRecipes.objects.create(user=self.reader, recipes=self.recipe)
+        stale = Recipe.objects.get(pk=self.recipe.pk)
+        stale.favorites_count = 0
+        stale.save(update_fields=('favorites_count',))
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+
+    def test_decrement_does_not_go_below_zero(self):
+        favorite = FavoritesRecipes.objects.create(
+            user=self.reader, recipes=self.recipe
+        )
+        Recipe.objects.filter(pk=self.recipe.pk).update(favorites_count=0)
+        favorite.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_reconcile(self):
+        FavoritesRecipes.objects.bulk_create([
+            FavoritesRecipes(user=self.reader, recipes=self.recipe)
+        ])
+        self.assertEqual(counters.reconcile()['Recipe.favorites_count'], 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+URL = '/api/recipes/feed/'
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+@override_settings(JOBS_EAGER=True)
+class FeedTest(TestCase):
+
+    def setUp(self):
+        self.reader = create_user('reader')
+        self.author = create_user('author')
+        self.other = create_user('other')
+        self.old_recipe = self.create_recipe(self.author, 'Старый')
+        self.create_recipe(self.other, 'Чужой')
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def create_recipe(self, author, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                author=author, name=name, text='Текст', cooking_time=5
+            )
+
+    def get_feed(self, **params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_names(self):
+        return [recipe['name'] for recipe in self.get_feed()['results']]
+
+    def subscribe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/users/{self.author.id}/subscribe/'
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_subscribe_backfills_feed(self):
+        self.assertEqual(self.get_names(), [])
+        self.subscribe()
+        self.assertEqual(self.get_names(), ['Старый'])
+
+    def test_new_recipe_reaches_subscribers(self):
+        self.subscribe()
+        self.create_recipe(self.author, 'Новый')
+        self.create_recipe(self.other, 'Ещё чужой')
+        self.assertEqual(self.get_names(), ['Новый', 'Старый'])
+
+    def test_unsubscribe_and_delete(self):
+        self.subscribe()
+        self.create_recipe(self.author, 'Новый')
+        self.old_recipe.delete()
+        self.assertEqual(self.get_names(), ['Новый'])
+        response = self.client.delete(
+            f'/api/users/{self.author.id}/subscribe/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_names(), [])
+
+    def test_pages(self):
+        self.subscribe()
+        for number in range(3):
+            self.create_recipe(self.author, f'Рецепт {number}')
+        page = self.get_feed(limit=3)
+        self.assertEqual(
+            [recipe['name'] for recipe in page['results']],
+            ['Рецепт 2', 'Рецепт 1', 'Рецепт 0']
+        )
+        page = self.client.get(page['next']).json()
+        self.assertEqual(
+            [recipe['name'] for recipe in page['results']], ['Старый']
+        )
+        self.assertIsNone(page['next'])
@@ -0,0 +1,58 @@
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from recipes.models import Recipe
+from recipes.tasks import build_recipe_image_variants
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_EAGER=False)
+class ImageVariantsInvalidationTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), (200, 100, 50)).save(buffer, 'PNG')
+        self.recipe = Recipe.objects.create(
+            author=author, name='Рецепт', text='Текст', cooking_time=10,
+            image=SimpleUploadedFile('recipe.png', buffer.getvalue())
+        )
+        self.url = f'/api/recipes/{self.recipe.id}/'
+
+    def test_worker_job_invalidates_cached_response(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['image_variants'], {})
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        job = Job.objects.get(name=build_recipe_image_variants.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(job.execute(), Job.DONE)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('card', response.json()['image_variants'])
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from recipes.models import Ingredient
+
+
+class ImportCsvTest(TestCase):
+
+    def setUp(self):
+        Ingredient.objects.create(name='мука', measurement_unit='г')
+
+    def write(self, content, suffix='.csv'):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, encoding='utf-8', delete=False
+        ) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def import_file(self, path, **options):
+        stdout = StringIO()
+        call_command(
+            'import_csv', path=path, stdout=stdout, stderr=StringIO(),
+            **options
+        )
+        return stdout.getvalue()
+
+    def test_csv(self):
+        output = self.import_file(
+            self.write('мука,г\nсоль,г\nсоль,г\n,г\nсахар,г\n'),
+            batch_size=1
+        )
+        self.assertIn(
+            'Прочитано строк: 5, добавлено: 2, повторов: 2, с ошибками: 1',
+            output
+        )
+        self.assertEqual(
+            set(Ingredient.objects.values_list('name', flat=True)),
+            {'мука', 'соль', 'сахар'}
+        )
+
+    def test_json(self):
+        self.import_file(self.write(json.dumps([
+            {'name': 'соль', 'measurement_unit': 'г'},
+        ]), suffix='.json'))
+        self.assertTrue(Ingredient.objects.filter(name='соль').exists())
+
+    def test_conflicting_rows_are_not_counted(self):
+        # Строку уже вставил другой процесс после того, как команда
+        # прочитала справочник.
+        with mock.patch.object(
+            Ingredient.objects, 'values_list', return_value=[]
+        ):
+            output = self.import_file(self.write('мука,г\nсоль,г\n'))
+        self.assertIn('добавлено: 1, повторов: 1', output)
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            self.import_file('/nonexistent/ingredients.csv')
@@ -0,0 +1,51 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+
+class IngredientSearchTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        Ingredient.objects.create(name='картофель', measurement_unit='г')
+
+    def search(self, name):
+        response = self.client.get('/api/ingredients/', {'name': name})
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()]
+
+    def test_search_by_prefix(self):
+        self.assertEqual(self.search('карт'), ['картофель'])
+
+    def test_search_does_not_query_database(self):
+        ingredient_index.search('карт')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [item['name'] for item in ingredient_index.search('карт')],
+                ['картофель']
+            )
+
+    def test_local_change_reaches_built_index(self):
+        self.assertEqual(self.search('карт'), ['картофель'])
+        Ingredient.objects.create(name='карри', measurement_unit='г')
+        self.assertEqual(self.search('кар'), ['карри', 'картофель'])
+
+    @override_settings(INGREDIENT_INDEX_CHECK_INTERVAL=0)
+    def test_import_csv_reaches_built_index(self):
+        self.assertEqual(self.search('кориц'), [])
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', encoding='utf-8', delete=False
+        ) as file:
+            file.write('корица,г\n')
+        self.addCleanup(os.remove, file.name)
+        # Команда не трогает индекс процесса: он перестраивается
+        # по версии справочника в базе.
+        call_command('import_csv', path=file.name, stdout=StringIO())
+        self.assertEqual(self.search('кориц'), ['корица'])
@@ -0,0 +1,73 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from subs.models import Subscriber
+
+User = get_user_model()
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+def count_queries(response):
+    return int(re.search(r'"(\d+) queries"', response['Server-Timing'])[1])
+
+
+class IsSubscribedTest(TestCase):
+
+    def setUp(self):
+        # Версии в TestCase не меняются, и число объектов из кеша
+        # прошлого теста обрезало бы страницу.
+        cache.clear()
+        self.reader = create_user('reader')
+        self.followed = create_user('followed')
+        self.other = create_user('other')
+        Subscriber.objects.create(
+            user=self.reader, subscriptions=self.followed
+        )
+        for author in (self.followed, self.other):
+            Recipe.objects.create(
+                author=author, name='Рецепт', text='Текст', cooking_time=5
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def test_user_list(self):
+        users = self.client.get('/api/users/').json()['results']
+        self.assertEqual(
+            {user['username']: user['is_subscribed'] for user in users},
+            {'reader': False, 'followed': True, 'other': False}
+        )
+
+    def test_recipe_authors(self):
+        recipes = self.client.get('/api/recipes/').json()['results']
+        self.assertEqual(
+            {
+                recipe['author']['username']: recipe['author']['is_subscribed']
+                for recipe in recipes
+            },
+            {'followed': True, 'other': False}
+        )
+
+    def test_anonymous(self):
+        users = APIClient().get('/api/users/').json()['results']
+        self.assertFalse(any(user['is_subscribed'] for user in users))
+
+    def test_query_count_does_not_grow(self):
+        queries = count_queries(self.client.get('/api/users/'))
+        for name in ('first', 'second', 'third'):
+            Subscriber.objects.create(
+                user=self.reader, subscriptions=create_user(name)
+            )
+        cache.clear()
+        response = self.client.get('/api/users/')
+        self.assertEqual(count_queries(response), queries)
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from subs.models import Subscriber
+
+User = get_user_model()
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+class KeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        # Версии в TestCase не меняются, и число объектов из кеша
+        # прошлого теста обрезало бы страницу.
+        cache.clear()
+        self.reader = create_user('reader')
+        self.authors = [create_user(f'author{number}') for number in range(5)]
+        for author in self.authors:
+            Subscriber.objects.create(user=self.reader, subscriptions=author)
+            for number in range(2):
+                Recipe.objects.create(
+                    author=author, name=f'Рецепт {number}', text='Текст',
+                    cooking_time=5
+                )
+        # Одинаковое время создания: порядок держится на id.
+        Recipe.objects.filter(author__in=self.authors[:3]).update(
+            created_at=timezone.now()
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def walk(self, url, limit=3):
+        """Проходит все страницы по ссылкам next и собирает id."""
+        ids = []
+        response = self.client.get(url, {'cursor': '', 'limit': limit})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn('count', data)
+            self.assertLessEqual(len(data['results']), limit)
+            ids.extend(item['id'] for item in data['results'])
+            if data['next'] is None:
+                return ids
+            response = self.client.get(data['next'])
+
+    def get_page_ids(self, url):
+        response = self.client.get(url, {'limit': 100})
+        return [item['id'] for item in response.json()['results']]
+
+    def test_recipes(self):
+        ids = self.walk('/api/recipes/')
+        self.assertEqual(len(ids), 10)
+        self.assertEqual(ids, self.get_page_ids('/api/recipes/'))
+
+    def test_users(self):
+        ids = self.walk('/api/users/')
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(ids, self.get_page_ids('/api/users/'))
+
+    def test_subscriptions(self):
+        ids = self.walk('/api/users/subscriptions/', limit=2)
+        self.assertEqual(
+            ids, [author.id for author in reversed(self.authors)]
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/recipes/', {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from backend import metrics
+
+METRICS_DIR = tempfile.mkdtemp()
+
+REQUESTS = 'foodgram_http_requests_total'
+
+
+@override_settings(METRICS_DIR=METRICS_DIR)
+class MetricsTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        for path in os.listdir(METRICS_DIR):
+            os.remove(os.path.join(METRICS_DIR, path))
+        metrics.registry.counters.clear()
+        metrics.registry.histograms.clear()
+        self.client = APIClient()
+
+    def get_metrics(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_requests_are_counted(self):
+        self.client.get('/api/tags/')
+        self.client.get('/api/tags/')
+        self.client.get('/api/recipes/')
+        self.client.get('/api/recipes/')
+        content = self.get_metrics()
+        self.assertIn(
+            f'{REQUESTS}{{method="GET",status="200",view="tags-list"}} 2',
+            content
+        )
+        self.assertIn(
+            'foodgram_db_queries_count{view="tags-list"} 2', content
+        )
+        self.assertIn(
+            'foodgram_cache_requests_total'
+            '{cache="response",result="hit"} 1',
+            content
+        )
+        self.assertIn(
+            'foodgram_http_request_duration_seconds_bucket'
+            '{method="GET",view="recipes-list",le="+Inf"} 2',
+            content
+        )
+
+    def test_other_processes_are_added(self):
+        self.client.get('/api/tags/')
+        with open(os.path.join(METRICS_DIR, '0.json'), 'w') as file:
+            json.dump({
+                'counters': [[
+                    REQUESTS,
+                    {'method': 'GET', 'status': 200, 'view': 'tags-list'},
+                    4
+                ]],
+                'histograms': [],
+            }, file)
+        self.assertIn(
+            f'{REQUESTS}{{method="GET",status="200",view="tags-list"}} 5',
+            self.get_metrics()
+        )
+
+    @override_settings(METRICS_DIR='')
+    def test_disabled(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+PROFILING_DIR = tempfile.mkdtemp()
+
+URL = '/api/request-profiles/'
+
+
+def create_client(name, is_staff):
+    user = User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password',
+        is_staff=is_staff
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+    )
+    return client
+
+
+@override_settings(
+    PROFILING_DIR=PROFILING_DIR, PROFILING_SAMPLE_RATE=1.0,
+    PROFILING_MAX_FILES=2
+)
+class ProfilingTest(TestCase):
+
+    def setUp(self):
+        shutil.rmtree(PROFILING_DIR, ignore_errors=True)
+        self.staff = create_client('staff', is_staff=True)
+        self.user = create_client('user', is_staff=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(PROFILING_DIR, ignore_errors=True)
+
+    def test_staff_request_is_profiled(self):
+        response = self.staff.get('/api/tags/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Id']
+        profile = self.staff.get(f'{URL}{name}/', {'sort': 'tottime'}).json()
+        self.assertEqual(profile['path'], '/api/tags/')
+        self.assertEqual(profile['view'], 'tags-list')
+        self.assertEqual(profile['status'], 200)
+        self.assertIn('function calls', profile['stats'])
+        download = self.staff.get(f'{URL}{name}/', {'download': 1})
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(download.has_header('Content-Disposition'))
+
+    def test_not_requested_or_not_staff(self):
+        self.assertNotIn('X-Profile-Id', self.staff.get('/api/tags/'))
+        response = self.user.get('/api/tags/', {'_profile': 1})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.user.get(URL).status_code, 403)
+
+    def test_old_profiles_are_removed(self):
+        names = [
+            self.staff.get('/api/tags/', HTTP_X_PROFILE='1')['X-Profile-Id']
+            for _ in range(3)
+        ]
+        listed = [profile['name'] for profile in self.staff.get(URL).json()]
+        self.assertEqual(len(listed), 2)
+        self.assertNotIn(min(names), listed)
+        self.assertEqual(self.staff.get(f'{URL}unknown/').status_code, 404)
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.v1.views import ProfileUserViewSet, RecipeViewSet
+from backend.middleware import QueryBudgetExceeded
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from shopper.models import ShopRecipes
+
+User = get_user_model()
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QueryBudgetTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        recipe = Recipe.objects.create(
+            author=self.user, name='Рецепт', text='Текст', cooking_time=5
+        )
+        RecipeIngredient.objects.create(
+            recipe=recipe, amount=100,
+            ingredient=Ingredient.objects.create(
+                name='мука', measurement_unit='г'
+            )
+        )
+        ShopRecipes.objects.create(user=self.user, recipes=recipe)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing(self):
+        response = self.client.get('/api/users/me/')
+        self.assertIn('queries"', response['Server-Timing'])
+
+    def test_streamed_body_is_within_budget(self):
+        response = self.client.get(DOWNLOAD_URL)
+        self.assertTrue(response.streaming)
+        self.assertNotIn('Server-Timing', response)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('мука - 100 (г)', content)
+
+    def test_streamed_body_queries_are_counted(self):
+        budgets = {**RecipeViewSet.query_budgets, 'download_shopping_cart': 0}
+        with mock.patch.object(RecipeViewSet, 'query_budgets', budgets):
+            response = self.client.get(DOWNLOAD_URL)
+            with self.assertLogs('backend.middleware', 'WARNING') as logs:
+                content = b''.join(response.streaming_content).decode()
+        self.assertIn('мука - 100 (г)', content)
+        self.assertIn('shopper_shopingredients', logs.output[0])
+
+    def test_budget_exceeded(self):
+        budgets = {**ProfileUserViewSet.query_budgets, 'me': 0}
+        with mock.patch.object(ProfileUserViewSet, 'query_budgets', budgets):
+            with self.assertRaises(QueryBudgetExceeded) as error:
+                self.client.get('/api/users/me/')
+        self.assertIn('subs_subscriber', str(error.exception))
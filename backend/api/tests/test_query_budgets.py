@@ -0,0 +1,157 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.models import Version
+from api.v1.views import (
+    IngredientViewSet,
+    ProfileUserViewSet,
+    RecipeViewSet,
+    TagViewSet
+)
+from favorites.models import FavoritesRecipes
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from shopper.models import ShopRecipes
+from subs.models import FeedEntry, Subscriber
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def get_avatar():
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), (200, 100, 50)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT, QUERY_BUDGET_RAISE=False, JOBS_EAGER=False
+)
+class QueryBudgetsTest(TransactionTestCase):
+    """
+    Каждое действие с бюджетом выполняется один раз в худшем случае:
+    с токеном, фильтрами, пустыми кешами и без строк версий. Транзакции
+    фиксируются по-настоящему, поэтому запросы из on_commit (bump
+    версий) тоже попадают в счёт.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.followed = User.objects.create_user(
+            email='followed@example.com', username='followed',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        self.ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        self.recipes = []
+        # У пользователя тоже есть рецепт: его правки сбрасывают
+        # ещё и версию 'authors'.
+        for author in (self.author, self.followed, self.user):
+            for number in range(3):
+                recipe = Recipe.objects.create(
+                    author=author, name=f'Рецепт {number}', text='Текст',
+                    cooking_time=5
+                )
+                recipe.tags.set((self.tag,))
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=self.ingredient, amount=100
+                )
+                self.recipes.append(recipe)
+        self.recipe, self.liked, self.in_cart = self.recipes[:3]
+        Subscriber.objects.create(user=self.user, subscriptions=self.followed)
+        FeedEntry.objects.backfill(self.user.id, (self.followed.id,))
+        FavoritesRecipes.objects.create(user=self.user, recipes=self.liked)
+        ShopRecipes.objects.create(user=self.user, recipes=self.in_cart)
+        # Токен, а не force_authenticate: его поиск — тоже запрос.
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user)}'
+        )
+
+    def get_cases(self):
+        author, followed = self.author, self.followed
+        recipe, liked, in_cart = self.recipe, self.liked, self.in_cart
+        return (
+            ('get', '/api/users/', None),
+            ('get', f'/api/users/{author.id}/', None),
+            ('get', '/api/users/me/', None),
+            ('post', '/api/users/set_password/', {
+                'current_password': 'password',
+                'new_password': 'new-password-123',
+            }),
+            ('put', '/api/users/me/avatar/', {'avatar': get_avatar()}),
+            ('delete', '/api/users/me/avatar/', None),
+            ('get', '/api/users/subscriptions/', None),
+            ('post', f'/api/users/{author.id}/subscribe/', None),
+            ('delete', f'/api/users/{followed.id}/subscribe/', None),
+            ('get', '/api/tags/', None),
+            ('get', f'/api/tags/{self.tag.id}/', None),
+            ('get', '/api/ingredients/', {'name': 'му'}),
+            ('get', f'/api/ingredients/{self.ingredient.id}/', None),
+            ('get', '/api/recipes/', {'tags': 'breakfast'}),
+            ('get', f'/api/recipes/{recipe.id}/', None),
+            ('get', '/api/recipes/feed/', None),
+            ('get', f'/api/recipes/{recipe.id}/get-link/', None),
+            ('post', f'/api/recipes/{recipe.id}/favorite/', None),
+            ('delete', f'/api/recipes/{liked.id}/favorite/', None),
+            ('post', f'/api/recipes/{recipe.id}/shopping_cart/', None),
+            ('delete', f'/api/recipes/{in_cart.id}/shopping_cart/', None),
+            ('get', '/api/recipes/download_shopping_cart/', None),
+            # Регистрация — последней: запрос анонимный.
+            ('post', '/api/users/', {
+                'email': 'new@example.com', 'username': 'new',
+                'first_name': 'Имя', 'last_name': 'Фамилия',
+                'password': 'new-password-123',
+            }),
+        )
+
+    def test_actions_stay_within_budget(self):
+        measured = {}
+        for method, url, data in self.get_cases():
+            if url == '/api/users/' and method == 'post':
+                self.client.credentials()
+            # Худший случай: строк версий ещё нет, и bump() их вставляет.
+            Version.objects.all().delete()
+            response = getattr(self.client, method)(
+                url, data, format='json' if method != 'get' else None
+            )
+            self.assertLess(response.status_code, 300, url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            request = response.wsgi_request
+            viewset = request.resolver_match.func.cls
+            action = request.resolver_match.func.actions[method]
+            measured[viewset, action] = request.query_stats.count
+        for viewset in (
+            ProfileUserViewSet, TagViewSet, IngredientViewSet, RecipeViewSet
+        ):
+            for action, budget in viewset.query_budgets.items():
+                with self.subTest(viewset=viewset.__name__, action=action):
+                    self.assertIn((viewset, action), measured)
+                    self.assertLessEqual(measured[viewset, action], budget)
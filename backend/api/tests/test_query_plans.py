@@ -0,0 +1,45 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from api.management.commands.check_query_plans import get_checks
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+@skipUnless(
+    connection.vendor == 'postgresql', 'EXPLAIN проверяется на PostgreSQL'
+)
+class QueryPlansTest(TestCase):
+    """
+    Горячие запросы должны читаться по индексам. Полный просмотр
+    таблиц запрещён: на тестовой базе он дешевле любого индекса,
+    а проверяется пригодность индексов для запросов.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user, name='Рецепт', text='Текст', cooking_time=5
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_hot_queries_use_indexes(self):
+        for label, queryset, index_names in get_checks(
+            self.user.id, self.recipe.id
+        ):
+            if isinstance(index_names, str):
+                index_names = (index_names,)
+            with self.subTest(label):
+                plan = queryset.explain()
+                self.assertTrue(
+                    any(name in plan for name in index_names),
+                    f'{label}: нет {", ".join(index_names)}\n{plan}'
+                )
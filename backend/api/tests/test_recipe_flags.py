@@ -0,0 +1,89 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from favorites.models import FavoritesRecipes
+from recipes.models import Recipe
+from shopper.models import ShopRecipes
+
+User = get_user_model()
+
+URL = '/api/recipes/'
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+def count_queries(response):
+    return int(re.search(r'"(\d+) queries"', response['Server-Timing'])[1])
+
+
+class RecipeFlagsTest(TestCase):
+
+    def setUp(self):
+        # Версии в TestCase не меняются, и число объектов из кеша
+        # прошлого теста обрезало бы страницу.
+        cache.clear()
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        self.favorite = self.create_recipe('Избранный')
+        self.in_cart = self.create_recipe('В корзине')
+        self.create_recipe('Обычный')
+        FavoritesRecipes.objects.create(
+            user=self.reader, recipes=self.favorite
+        )
+        ShopRecipes.objects.create(user=self.reader, recipes=self.in_cart)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def create_recipe(self, name):
+        return Recipe.objects.create(
+            author=self.author, name=name, text='Текст', cooking_time=5
+        )
+
+    def get_flags(self, response):
+        return {
+            recipe['name']: (
+                recipe['is_favorited'], recipe['is_in_shopping_cart']
+            )
+            for recipe in response.json()['results']
+        }
+
+    def test_list(self):
+        self.assertEqual(self.get_flags(self.client.get(URL)), {
+            'Избранный': (True, False),
+            'В корзине': (False, True),
+            'Обычный': (False, False),
+        })
+
+    def test_retrieve(self):
+        response = self.client.get(f'{URL}{self.favorite.id}/')
+        self.assertTrue(response.json()['is_favorited'])
+        self.assertFalse(response.json()['is_in_shopping_cart'])
+
+    def test_anonymous(self):
+        flags = self.get_flags(APIClient().get(URL))
+        self.assertEqual(set(flags.values()), {(False, False)})
+
+    def test_filters(self):
+        flags = self.get_flags(self.client.get(URL, {'is_favorited': 1}))
+        self.assertEqual(flags, {'Избранный': (True, False)})
+        flags = self.get_flags(
+            self.client.get(URL, {'is_in_shopping_cart': 1})
+        )
+        self.assertEqual(flags, {'В корзине': (False, True)})
+
+    def test_query_count_does_not_grow(self):
+        queries = count_queries(self.client.get(URL))
+        for number in range(3):
+            recipe = self.create_recipe(f'Рецепт {number}')
+            FavoritesRecipes.objects.create(user=self.reader, recipes=recipe)
+        cache.clear()
+        self.assertEqual(count_queries(self.client.get(URL)), queries)
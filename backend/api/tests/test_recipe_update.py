@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+
+User = get_user_model()
+
+
+class RecipeUpdateTest(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.breakfast = Tag.objects.create(name='Завтрак', slug='breakfast')
+        self.dinner = Tag.objects.create(name='Ужин', slug='dinner')
+        self.flour, self.salt, self.sugar, self.eggs = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('мука', 'соль', 'сахар', 'яйца')
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='Рецепт', text='Текст', cooking_time=5
+        )
+        self.recipe.tags.set((self.breakfast,))
+        for ingredient, amount in (
+            (self.flour, 100), (self.salt, 5), (self.sugar, 20)
+        ):
+            RecipeIngredient.objects.create(
+                recipe=self.recipe, ingredient=ingredient, amount=amount
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def get_links(self):
+        return {
+            link.ingredient_id: (link.id, link.amount)
+            for link in RecipeIngredient.objects.filter(recipe=self.recipe)
+        }
+
+    def test_only_changed_rows_are_touched(self):
+        before = self.get_links()
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.id}/',
+            {
+                'name': 'Новое название',
+                'text': 'Текст',
+                'cooking_time': 5,
+                'tags': [self.dinner.id],
+                'ingredients': [
+                    {'id': self.flour.id, 'amount': 100},
+                    {'id': self.salt.id, 'amount': 10},
+                    {'id': self.eggs.id, 'amount': 2},
+                ],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        after = self.get_links()
+        self.assertEqual(
+            set(after), {self.flour.id, self.salt.id, self.eggs.id}
+        )
+        self.assertEqual(after[self.flour.id], before[self.flour.id])
+        self.assertEqual(after[self.salt.id], (before[self.salt.id][0], 10))
+        self.assertEqual(after[self.eggs.id][1], 2)
+        self.assertEqual(
+            list(self.recipe.tags.values_list('slug', flat=True)), ['dinner']
+        )
+        self.assertEqual(
+            sorted(
+                (item['name'], item['amount'])
+                for item in response.json()['ingredients']
+            ),
+            [('мука', 100), ('соль', 10), ('яйца', 2)]
+        )
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+class AnonymousResponseCacheTest(TestCase):
+    url = '/api/recipes/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        Recipe.objects.create(
+            author=self.author, name='Рецепт', text='Текст', cooking_time=5
+        )
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+    def get_cache_status(self):
+        return self.client.get(self.url)['X-Cache']
+
+    def test_unrelated_user_changes_keep_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_user('newcomer')
+            self.reader.first_name = 'Другое имя'
+            self.reader.save()
+            author = User.objects.get(pk=self.author.pk)
+            author.set_password('new-password')
+            author.save()
+        self.assertEqual(self.get_cache_status(), 'HIT')
+
+    def test_author_change_invalidates_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            author = User.objects.get(pk=self.author.pk)
+            author.first_name = 'Новое имя'
+            author.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(
+            response.json()['results'][0]['author']['first_name'],
+            'Новое имя'
+        )
@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from shopper.models import ShopIngredients, ShopRecipes
+
+User = get_user_model()
+
+
+class ShoppingListTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(name='Обед', slug='lunch')
+        self.ingredients = [
+            Ingredient.objects.create(name=f'ингредиент {number}',
+                                      measurement_unit='г')
+            for number in range(4)
+        ]
+        self.recipe = self.create_recipe({0: 100, 1: 50})
+        self.other = self.create_recipe({1: 30, 2: 10})
+
+    def create_recipe(self, amounts):
+        recipe = Recipe.objects.create(
+            author=self.user, name='Рецепт', text='Текст', cooking_time=5
+        )
+        recipe.tags.add(self.tag)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient=self.ingredients[number],
+                amount=amount
+            )
+            for number, amount in amounts.items()
+        )
+        return recipe
+
+    def get_list(self):
+        return dict(
+            ShopIngredients.objects.filter(user=self.user)
+            .values_list('ingredient_id', 'amount')
+        )
+
+    def get_expected(self):
+        return dict(
+            RecipeIngredient.objects.filter(
+                recipe__in_shopping_cart__user=self.user
+            ).values('ingredient_id').annotate(total=Sum('amount'))
+            .order_by().values_list('ingredient_id', 'total')
+        )
+
+    def assertListIsCurrent(self):
+        self.assertEqual(self.get_list(), self.get_expected())
+
+    def test_orm_cart_changes(self):
+        item = ShopRecipes.objects.create(user=self.user, recipes=self.recipe)
+        ShopRecipes.objects.create(user=self.user, recipes=self.other)
+        self.assertListIsCurrent()
+        item.delete()
+        self.assertListIsCurrent()
+
+    def test_orm_recipe_delete(self):
+        ShopRecipes.objects.create(user=self.user, recipes=self.recipe)
+        ShopRecipes.objects.create(user=self.user, recipes=self.other)
+        Recipe.objects.filter(pk=self.recipe.pk).delete()
+        self.assertListIsCurrent()
+        self.other.delete()
+        self.assertEqual(self.get_list(), {})
+
+    def test_orm_recipe_ingredient_changes(self):
+        ShopRecipes.objects.create(user=self.user, recipes=self.recipe)
+        link = RecipeIngredient.objects.get(
+            recipe=self.recipe, ingredient=self.ingredients[0]
+        )
+        link.amount = 70
+        link.save()
+        self.assertListIsCurrent()
+        link.ingredient = self.ingredients[3]
+        link.save()
+        self.assertListIsCurrent()
+        RecipeIngredient.objects.create(
+            recipe=self.recipe, ingredient=self.ingredients[2], amount=5
+        )
+        self.assertListIsCurrent()
+        link.delete()
+        self.assertListIsCurrent()
+
+    def test_api_cart_and_recipe_update(self):
+        url = f'/api/recipes/{self.recipe.id}/shopping_cart/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        response = self.client.post(
+            '/api/recipes/shopping_cart/batch/',
+            {'ids': [self.other.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertListIsCurrent()
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.id}/',
+            {
+                'ingredients': [
+                    {'id': self.ingredients[1].id, 'amount': 20},
+                    {'id': self.ingredients[3].id, 'amount': 40},
+                ],
+                'tags': [self.tag.id],
+                'name': 'Рецепт', 'text': 'Текст', 'cooking_time': 5,
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertListIsCurrent()
+        response = self.client.delete(
+            '/api/recipes/shopping_cart/batch/',
+            {'ids': [self.other.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertListIsCurrent()
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.get_list(), {})
+
+    def test_api_recipe_delete(self):
+        ShopRecipes.objects.create(user=self.user, recipes=self.recipe)
+        response = self.client.delete(f'/api/recipes/{self.recipe.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_list(), {})
+
+    def test_rebuild(self):
+        ShopRecipes.objects.bulk_create([
+            ShopRecipes(user=self.user, recipes=self.recipe)
+        ])
+        self.assertEqual(self.get_list(), {})
+        ShopIngredients.objects.rebuild()
+        self.assertListIsCurrent()
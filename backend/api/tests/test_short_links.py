@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Version
+from backend.versions import bump
+from recipes import shortlinks
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class ShortLinksTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+        self.recipe = Recipe.objects.create(
+            author=author, name='Рецепт', text='Текст', cooking_time=5
+        )
+
+    def get_short_link(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.id}/get-link/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['short-link']
+
+    def test_encode_decode(self):
+        codes = {shortlinks.encode(recipe_id) for recipe_id in range(1, 1000)}
+        self.assertEqual(len(codes), 999)
+        for recipe_id in (1, 2, 999, 10 ** 9):
+            self.assertEqual(
+                shortlinks.decode(shortlinks.encode(recipe_id)), recipe_id
+            )
+
+    def test_redirect(self):
+        response = self.client.get(self.get_short_link())
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            response['Location'],
+            f'http://testserver/recipes/{self.recipe.id}/'
+        )
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+    def test_legacy_code(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(short_url='abcdef')
+        response = self.client.get('/api/s/abcdef/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_unknown_code(self):
+        self.assertEqual(self.client.get('/api/s/zzzzzzz/').status_code, 404)
+
+    def test_deleted_recipe(self):
+        url = self.get_short_link()
+        self.assertEqual(self.client.get(url).status_code, 302)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_delete_in_another_process(self):
+        url = self.get_short_link()
+        bump(shortlinks.VERSION_SCOPE)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        # Удаление в другом процессе: его кеши сюда не достают,
+        # меняется только строка рецепта и версия в базе.
+        Recipe.objects.filter(pk=self.recipe.pk)._raw_delete('default')
+        Version.objects.filter(scope=shortlinks.VERSION_SCOPE).update(
+            value=F('value') + 1
+        )
+        self.assertEqual(self.client.get(url).status_code, 404)
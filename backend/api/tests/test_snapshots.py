@@ -0,0 +1,63 @@
+import gzip
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes import snapshots
+from recipes.models import Ingredient, Tag
+
+SNAPSHOT_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SNAPSHOT_ROOT=SNAPSHOT_ROOT, JOBS_EAGER=True)
+class SnapshotsTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SNAPSHOT_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Завтрак', slug='breakfast')
+            Ingredient.objects.create(name='мука', measurement_unit='г')
+
+    def read_snapshot(self, name):
+        filename = snapshots.read_manifest()[name]
+        path = Path(SNAPSHOT_ROOT) / filename
+        content = path.read_bytes()
+        self.assertEqual(
+            gzip.decompress(path.with_name(f'{filename}.gz').read_bytes()),
+            content
+        )
+        return json.loads(content)
+
+    def test_snapshot_matches_api(self):
+        for name in ('tags', 'ingredients'):
+            self.assertEqual(
+                self.read_snapshot(name),
+                self.client.get(f'/api/{name}/').json()
+            )
+
+    def test_change_rebuilds_snapshot(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.assertEqual(
+            [item['name'] for item in self.read_snapshot('ingredients')],
+            ['мука', 'соль']
+        )
+
+    def test_link_header(self):
+        filename = snapshots.read_manifest()['tags']
+        self.assertEqual(
+            self.client.get('/api/tags/')['Link'],
+            f'<http://testserver/snapshots/{filename}>; '
+            'rel="alternate"; type="application/json"'
+        )
+        response = self.client.get('/api/ingredients/', {'name': 'му'})
+        self.assertNotIn('Link', response)
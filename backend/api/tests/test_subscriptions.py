@@ -0,0 +1,77 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from subs.models import Subscriber
+
+User = get_user_model()
+
+URL = '/api/users/subscriptions/'
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name,
+        first_name='Имя', last_name='Фамилия', password='password'
+    )
+
+
+def count_queries(response):
+    return int(re.search(r'"(\d+) queries"', response['Server-Timing'])[1])
+
+
+class SubscriptionsTest(TestCase):
+
+    def setUp(self):
+        # Версии в TestCase не меняются, и число объектов из кеша
+        # прошлого теста обрезало бы страницу.
+        cache.clear()
+        self.reader = create_user('reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def subscribe(self, name, recipes):
+        author = create_user(name)
+        Subscriber.objects.create(user=self.reader, subscriptions=author)
+        for number in range(recipes):
+            Recipe.objects.create(
+                author=author, name=f'Рецепт {number}', text='Текст',
+                cooking_time=5
+            )
+        return author
+
+    def test_empty(self):
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+        response = self.client.get(URL, {'cursor': ''})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_recipes_limit(self):
+        first = self.subscribe('first', 3)
+        second = self.subscribe('second', 1)
+        response = self.client.get(URL, {'recipes_limit': 2})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(
+            [author['id'] for author in results], [second.id, first.id]
+        )
+        self.assertEqual(
+            [recipe['name'] for recipe in results[1]['recipes']],
+            ['Рецепт 2', 'Рецепт 1']
+        )
+        self.assertEqual(len(results[0]['recipes']), 1)
+        self.assertTrue(results[0]['is_subscribed'])
+
+    def test_query_count_does_not_grow(self):
+        self.subscribe('first', 2)
+        queries = count_queries(self.client.get(URL))
+        self.subscribe('second', 2)
+        self.subscribe('third', 2)
+        cache.clear()
+        self.assertEqual(count_queries(self.client.get(URL)), queries)
@@ -0,0 +1,31 @@
+from django.db.models import F
+from django.test import TestCase
+
+from api.models import Version
+from backend.versions import bump, get_versions
+
+
+class VersionsTest(TestCase):
+
+    def test_unchanged_scope_is_not_written(self):
+        self.assertEqual(get_versions('recipes'), (0,))
+        self.assertFalse(Version.objects.exists())
+
+    def test_bump_increases_version(self):
+        before, = get_versions('tags')
+        bump('tags')
+        after, = get_versions('tags')
+        self.assertGreater(after, before)
+
+    def test_bump_from_another_process_is_visible(self):
+        bump('ingredients')
+        before, = get_versions('ingredients')
+        # Так выглядит bump() из воркера или команды manage.py.
+        Version.objects.filter(scope='ingredients').update(
+            value=F('value') + 1
+        )
+        self.assertEqual(get_versions('ingredients'), (before + 1,))
+
+    def test_bump_creates_missing_scope(self):
+        bump('cart:1')
+        self.assertTrue(Version.objects.filter(scope='cart:1').exists())
@@ -1,13 +1,8 @@
 import django_filters
-from rest_framework.filters import SearchFilter
 
 from recipes.models import Recipe, Tag
 
 
-class IngredientFilter(SearchFilter):
-    search_param = 'name'
-
-
 class RecipesFilter(django_filters.FilterSet):
     tags = django_filters.ModelMultipleChoiceFilter(
         field_name='tags__slug',
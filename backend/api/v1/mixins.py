@@ -0,0 +1,246 @@
+import gzip
+import hashlib
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from api import counters
+from backend import metrics
+from backend.versions import bump, get_versions
+from recipes.snapshots import get_snapshot_url
+from .serializers import BatchIdsSerializer
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы для list и retrieve.
+
+    ETag и Last-Modified считаются по версиям данных из
+    get_version_scopes(), поэтому на If-None-Match и If-Modified-Since
+    ответ 304 отдаётся без выборки данных и работы сериализатора.
+    Версии хранятся в базе, так что изменения из воркера задач,
+    админки в другом процессе gunicorn или manage.py тоже меняют ETag.
+    """
+
+    def get_version_scopes(self):
+        raise NotImplementedError
+
+    def get_user_version_scopes(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return ()
+        return (
+            f'favorites:{user.id}',
+            f'cart:{user.id}',
+            f'subscriptions:{user.id}',
+        )
+
+    def get_validators(self):
+        versions = get_versions(*self.get_version_scopes())
+        params = sorted(
+            (name, sorted(values))
+            for name, values in self.request.query_params.lists()
+        )
+        digest = hashlib.md5(json.dumps((
+            self.__class__.__name__,
+            self.action,
+            self.kwargs,
+            params,
+            self.request.user.id,
+            versions,
+        ), default=str).encode()).hexdigest()
+        return f'"{digest}"', int(max(versions, default=0))
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        metrics.record_cache('conditional', response is not None)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class SnapshotLinkMixin:
+    """
+    Добавляет к полному списку заголовок Link со ссылкой на
+    статический снимок справочника snapshot_name.
+    """
+    snapshot_name = None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.action == 'list' and not request.query_params:
+            url = get_snapshot_url(self.snapshot_name)
+            if url:
+                response['Link'] = (
+                    f'<{request.build_absolute_uri(url)}>; '
+                    'rel="alternate"; type="application/json"'
+                )
+        return response
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Общий кеш готовых ответов list и retrieve для анонимных запросов.
+
+    Ключ строится из действия, нормализованных параметров запроса,
+    выбранного формата ответа и версий данных из get_version_scopes(),
+    так что изменение рецепта, его ингредиентов, тегов или видимых
+    в рецептах полей автора делает старые записи недостижимыми. Тело
+    хранится сжатым gzip и отдаётся как есть клиентам, которые
+    принимают gzip.
+    """
+    response_cache_key = None
+
+    def get_response_cache_key(self, request):
+        if request.user.is_authenticated or request.method != 'GET':
+            return None
+        params = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+        )
+        digest = hashlib.md5(json.dumps((
+            self.__class__.__name__,
+            self.action,
+            self.kwargs,
+            params,
+            request.accepted_media_type,
+            get_versions(*self.get_version_scopes()),
+        ), default=str).encode()).hexdigest()
+        return f'response:{digest}'
+
+    def cached(self, handler, request, *args, **kwargs):
+        self.response_cache_key = self.get_response_cache_key(request)
+        if self.response_cache_key is None:
+            return handler(request, *args, **kwargs)
+        entry = cache.get(self.response_cache_key)
+        metrics.record_cache('response', entry is not None)
+        if entry is None:
+            return handler(request, *args, **kwargs)
+        self.response_cache_key = None
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(
+                gzip.decompress(entry['content']),
+                content_type=entry['content_type']
+            )
+        response['Content-Length'] = len(response.content)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.response_cache_key and response.status_code == 200:
+            response.render()
+            cache.set(self.response_cache_key, {
+                'content_type': response['Content-Type'],
+                'content': gzip.compress(response.content),
+            }, settings.RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+        if self.response_cache_key is not None or 'X-Cache' in response:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+
+class BatchRelationMixin:
+    """
+    Пакетное добавление (POST) и удаление (DELETE) связей пользователя
+    с объектами: избранное, корзина, подписки.
+
+    Тело запроса — {"ids": [...]}. Все id проверяются одним запросом,
+    связи создаются одним INSERT и удаляются одним DELETE. В ответе
+    для каждого id указан статус: added, exists, removed, missing,
+    not_found или invalid.
+    """
+
+    def batch_relations(self, model, field, queryset, scope, invalid=()):
+        """Возвращает ответ и список id, чьи связи изменились."""
+        request = self.request
+        serializer = BatchIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        found = set(
+            queryset.filter(id__in=ids).values_list('pk', flat=True)
+        )
+        relations = model.objects.filter(
+            user=request.user, **{f'{field}_id__in': found - set(invalid)}
+        )
+        existing = set(relations.values_list(f'{field}_id', flat=True))
+        if request.method == 'POST':
+            missing = [
+                pk for pk in ids
+                if pk in found and pk not in invalid and pk not in existing
+            ]
+            # Параллельный запрос мог добавить связь между проверкой и
+            # вставкой: такие строки пропускаются, а статусы берутся
+            # из повторного запроса. Связь из параллельного запроса
+            # тоже попадает в added, и лишнее приращение счётчиков и
+            # списков покупок выправят reconcile_counters и
+            # rebuild_shopping_lists.
+            model.objects.bulk_create(
+                (
+                    model(user=request.user, **{f'{field}_id': pk})
+                    for pk in missing
+                ),
+                ignore_conflicts=True
+            )
+            present = set(model.objects.filter(
+                user=request.user, **{f'{field}_id__in': missing}
+            ).values_list(f'{field}_id', flat=True))
+            changed = [pk for pk in missing if pk in present]
+            counters.add_created(model, [
+                model(user=request.user, **{f'{field}_id': pk})
+                for pk in changed
+            ])
+            done, skipped = 'added', 'exists'
+        else:
+            changed = [pk for pk in ids if pk in existing]
+            relations.delete()
+            done, skipped = 'removed', 'missing'
+        if changed:
+            transaction.on_commit(partial(bump, scope))
+        changed_ids = set(changed)
+        results = []
+        for pk in ids:
+            if pk not in found:
+                result = 'not_found'
+            elif pk in invalid:
+                result = 'invalid'
+            else:
+                result = done if pk in changed_ids else skipped
+            results.append({'id': pk, 'status': result})
+        return Response({'results': results}), changed
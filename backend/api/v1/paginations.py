@@ -1,8 +1,208 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    PageNumberPagination,
+    _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from backend import metrics
 from backend.constants import PAGE_SIZE
+from backend.db import estimate_count
+from backend.versions import get_versions
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничная выдача по ключу без COUNT(*) и OFFSET.
+
+    Ключом служит сортировка queryset (или Meta.ordering модели),
+    дополненная id для однозначности. Курсор хранит значения ключа
+    последнего объекта страницы, следующая страница выбирается
+    условием по индексу, поэтому глубина прокрутки не влияет на скорость.
+    """
+    page_size = PAGE_SIZE
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    @staticmethod
+    def get_ordering(queryset):
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    @staticmethod
+    def get_keyset_filter(ordering, values):
+        """
+        Условие «строго после values» для лексикографического ключа.
+
+        Первое поле дополнительно ограничено нестрогим неравенством,
+        чтобы планировщик мог использовать индекс как диапазон.
+        """
+        fields = [
+            (field.lstrip('-'), 'lt' if field.startswith('-') else 'gt')
+            for field in ordering
+        ]
+        after = Q()
+        for position, (field, lookup) in enumerate(fields):
+            condition = Q(**{f'{field}__{lookup}': values[position]})
+            for previous in range(position):
+                condition &= Q(**{fields[previous][0]: values[previous]})
+            after |= condition
+        first_field, first_lookup = fields[0]
+        return Q(**{f'{first_field}__{first_lookup}e': values[0]}) & after
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            values.append(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+            )
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(
+                self.ordering, self.decode_cursor(cursor)
+            ))
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('results', data),
+        )))
+
+
+class CountedPaginator(DjangoPaginator):
+    """Paginator, которому число объектов можно передать готовым."""
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            self.count = count
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Нумерация страниц с page и limit.
+
+    Число объектов кешируется по нормализованному набору фильтров и
+    версиям данных, которые вьюсет возвращает из
+    get_count_cache_scopes(). Для списков без фильтров по большим
+    таблицам PostgreSQL можно отдавать оценку планировщика
+    (ESTIMATED_COUNT_THRESHOLD).
+
+    Если в запросе есть параметр cursor (в том числе пустой),
+    выдача переключается на KeysetPagination.
+    """
     page_size = PAGE_SIZE
     page_size_query_param = 'limit'
+    keyset = None
+    ignored_count_params = ('page', 'limit', 'cursor', 'format')
+    # Фильтры, результат которых зависит от пользователя.
+    user_count_params = ('is_favorited', 'is_in_shopping_cart')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        self.django_paginator_class = partial(
+            CountedPaginator, count=self.get_count(queryset, request, view)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_count(self, queryset, request, view):
+        threshold = getattr(settings, 'ESTIMATED_COUNT_THRESHOLD', None)
+        if threshold and not queryset.query.where:
+            estimate = estimate_count(queryset.model)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        key = self.get_count_cache_key(request, view)
+        if key is None:
+            return None
+        count = cache.get(key)
+        metrics.record_cache('count', count is not None)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_count_cache_key(self, request, view):
+        get_scopes = getattr(view, 'get_count_cache_scopes', None)
+        scopes = get_scopes() if get_scopes else None
+        if not scopes:
+            return None
+        params = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+            if name not in self.ignored_count_params
+        )
+        user_id = None
+        if any(name in self.user_count_params for name, _ in params):
+            user_id = request.user.id
+        digest = hashlib.md5(json.dumps(
+            (view.__class__.__name__, view.action, params, user_id,
+             get_versions(*scopes))
+        ).encode()).hexdigest()
+        return f'count:{digest}'
@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from rest_framework import renderers
+
+CHUNK_SIZE = 64 * 1024
+PDF_SPOOL_SIZE = 1024 * 1024
+
+
+class _Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(renderers.BaseRenderer):
+    """
+    Базовый рендерер списка покупок.
+
+    Рендереры нужны вьюсету для выбора формата через ?format= и Accept,
+    сам список отдаётся потоково методом stream(), по умолчанию —
+    простым текстом, строка на ингредиент. Метод render() используется
+    только для ответов с ошибками.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def format_line(ingredient):
+        return (
+            f'{ingredient["name"]} - {ingredient["amount"]} '
+            f'({ingredient["measurement_unit"]})'
+        )
+
+    def stream(self, ingredients):
+        for ingredient in ingredients:
+            yield self.format_line(ingredient) + '\n'
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, ingredients):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for ingredient in ingredients:
+            yield writer.writerow((
+                ingredient['name'],
+                ingredient['measurement_unit'],
+                ingredient['amount'],
+            ))
+
+
+class ShoppingListJSONRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, ingredients):
+        yield '['
+        separator = ''
+        for ingredient in ingredients:
+            yield separator + json.dumps(ingredient, ensure_ascii=False)
+            separator = ','
+        yield ']'
+
+
+class ShoppingListPDFRenderer(ShoppingListRenderer):
+    """
+    PDF не потоковый: reportlab пишет таблицу ссылок в конец файла,
+    поэтому документ собирается целиком во временном файле (в памяти,
+    пока он меньше PDF_SPOOL_SIZE) и только потом отдаётся кусками
+    по CHUNK_SIZE.
+
+    Для кириллицы нужен TrueType-шрифт из SHOPPING_LIST_PDF_FONT,
+    без него используется встроенный Helvetica.
+    """
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    font_name = 'ShoppingListFont'
+    font_size = 12
+    margin = 50
+
+    def get_font(self):
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        font_path = getattr(settings, 'SHOPPING_LIST_PDF_FONT', None)
+        if not font_path or not os.path.exists(font_path):
+            return 'Helvetica'
+        if self.font_name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(self.font_name, font_path))
+        return self.font_name
+
+    def stream(self, ingredients):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_SIZE)
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        font = self.get_font()
+        _, height = A4
+        line_height = self.font_size * 1.5
+        y = height - self.margin
+        pdf.setFont(font, self.font_size)
+        for ingredient in ingredients:
+            if y < self.margin:
+                pdf.showPage()
+                pdf.setFont(font, self.font_size)
+                y = height - self.margin
+            pdf.drawString(self.margin, y, self.format_line(ingredient))
+            y -= line_height
+        pdf.save()
+        with buffer:
+            buffer.seek(0)
+            yield from iter(lambda: buffer.read(CHUNK_SIZE), b'')
+
+
+SHOPPING_LIST_RENDERERS = (
+    ShoppingListTextRenderer,
+    ShoppingListCSVRenderer,
+    ShoppingListJSONRenderer,
+    ShoppingListPDFRenderer,
+)
@@ -3,24 +3,39 @@ import uuid
 
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    F,
+    Prefetch,
+    Value,
+    prefetch_related_objects
+)
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from backend.constants import PAGE_SIZE
+from backend.constants import BATCH_IDS_MAX, PAGE_SIZE, RECIPES_LIMIT_MAX
 from favorites.models import FavoritesRecipes
 from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
-from shopper.models import ShopRecipes
-from subs.models import Subscriber
+from shopper.models import ShopIngredients, ShopRecipes
+from subs.models import FeedEntry, Subscriber
 
 User = get_user_model()
 
 
-def _get_user_relation_status(self, obj, relation_field):
-    request = self.context.get('request')
-    return (
-        request and request.user.is_authenticated
-        and getattr(obj, relation_field).filter(user=request.user).exists()
-    )
+def _get_subscribed_ids(request):
+    """
+    Id авторов, на которых подписан пользователь запроса.
+
+    Загружаются одним запросом и кешируются на объекте запроса, чтобы
+    все вложенные ProfileSerializer отвечали на is_subscribed из памяти.
+    """
+    if not hasattr(request, 'subscribed_ids'):
+        request.subscribed_ids = frozenset(
+            request.user.subscriber.values_list('subscriptions_id', flat=True)
+        ) if request.user.is_authenticated else frozenset()
+    return request.subscribed_ids
 
 
 class Base64ImageField(serializers.ImageField):
@@ -33,6 +48,29 @@ class Base64ImageField(serializers.ImageField):
         return super().to_internal_value(data)
 
 
+class ImageVariantsField(serializers.Field):
+    """Ссылки на уменьшенные копии изображения (WebP и JPEG) с размерами."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        result = {}
+        for size, entry in (value or {}).get('sizes', {}).items():
+            result[size] = {
+                'width': entry['width'],
+                'height': entry['height'],
+            }
+            for extension in ('webp', 'jpeg'):
+                url = default_storage.url(entry[extension])
+                result[size][extension] = (
+                    request.build_absolute_uri(url) if request else url
+                )
+        return result
+
+
 class ImageSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField(required=True, allow_null=True)
 
@@ -42,15 +80,17 @@ class ImageSerializer(serializers.ModelSerializer):
 
 
 class RecipeShortSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
         read_only_fields = ('id', 'name', 'image', 'cooking_time')
 
 
 class ProfileSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField(required=False, allow_null=True)
+    avatar_variants = ImageVariantsField()
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -63,41 +103,54 @@ class ProfileSerializer(serializers.ModelSerializer):
             'last_name',
             'is_subscribed',
             'avatar',
+            'avatar_variants',
         )
 
     def get_is_subscribed(self, obj):
-        return _get_user_relation_status(self, obj, 'subscribers')
+        request = self.context.get('request')
+        return bool(request) and obj.id in _get_subscribed_ids(request)
 
 
 class UserWithoutAuthorSerializer(ProfileSerializer):
-    recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    is_subscribed = serializers.BooleanField(read_only=True)
+    recipes = RecipeShortSerializer(
+        many=True, read_only=True, source='recent_recipes'
+    )
 
     class Meta:
         model = User
-        fields = ProfileSerializer.Meta.fields + ('recipes', 'recipes_count')
+        fields = ProfileSerializer.Meta.fields + (
+            'recipes', 'recipes_count', 'subscribers_count'
+        )
 
-    def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        return Subscriber.objects.filter(
-            subscriptions=obj, user=user
-        ).exists()
+    @staticmethod
+    def get_queryset(user):
+        """Авторы, на которых подписан user, от новых подписок к старым."""
+        return User.objects.filter(subscribers__user=user).annotate(
+            subscription_id=F('subscribers__id'),
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).order_by('-subscription_id')
 
-    def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit', PAGE_SIZE)
+    @staticmethod
+    def get_recipes_limit(request):
         try:
-            limit = int(limit)
+            limit = int(request.GET.get('recipes_limit', PAGE_SIZE))
         except ValueError:
-            pass
-        return RecipeShortSerializer(
-            Recipe.objects.filter(author=obj)[:limit],
-            many=True,
-            context={'request': request},
-        ).data
-
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+            limit = PAGE_SIZE
+        return min(max(limit, 0), RECIPES_LIMIT_MAX)
+
+    @classmethod
+    def prefetch_recipes(cls, authors, request):
+        """Подгружает последние рецепты сразу для всех авторов страницы."""
+        prefetch_related_objects(authors, Prefetch(
+            'recipe',
+            queryset=Recipe.objects.latest_per_author(
+                [author.id for author in authors],
+                cls.get_recipes_limit(request)
+            ),
+            to_attr='recent_recipes'
+        ))
+        return authors
 
 
 class SubscriberSerializer(serializers.ModelSerializer):
@@ -124,10 +177,22 @@ class SubscriberSerializer(serializers.ModelSerializer):
             )
         return data
 
+    @transaction.atomic
+    def create(self, validated_data):
+        subscription = super().create(validated_data)
+        FeedEntry.objects.backfill(
+            subscription.user_id, (subscription.subscriptions_id,)
+        )
+        return subscription
+
     def to_representation(self, instance):
-        return UserWithoutAuthorSerializer(
-            instance.subscriptions, context=self.context
-        ).data
+        author = UserWithoutAuthorSerializer.get_queryset(
+            instance.user
+        ).get(pk=instance.subscriptions_id)
+        UserWithoutAuthorSerializer.prefetch_recipes(
+            [author], self.context.get('request')
+        )
+        return UserWithoutAuthorSerializer(author, context=self.context).data
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -178,8 +243,9 @@ class ReadRecipeSerializer(serializers.ModelSerializer):
         many=True,
         source='ingredient_links'
     )
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
+    is_favorited = serializers.BooleanField(read_only=True)
+    is_in_shopping_cart = serializers.BooleanField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -192,16 +258,11 @@ class ReadRecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time',
         )
 
-    def get_is_favorited(self, obj):
-        return _get_user_relation_status(self, obj, 'favorites')
-
-    def get_is_in_shopping_cart(self, obj):
-        return _get_user_relation_status(self, obj, 'in_shopping_cart')
-
 
 class CreateRecipeSerializer(serializers.ModelSerializer):
     tags = serializers.PrimaryKeyRelatedField(
@@ -209,8 +270,8 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
     )
     ingredients = WriteRecipeIngredientSerializer(many=True)
     image = Base64ImageField()
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
+    is_favorited = serializers.BooleanField(read_only=True)
+    is_in_shopping_cart = serializers.BooleanField(read_only=True)
     author = ProfileSerializer(read_only=True)
 
     class Meta:
@@ -265,6 +326,7 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
             )
         RecipeIngredient.objects.bulk_create(result_ingredients)
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
@@ -272,17 +334,72 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         self.create_tags_and_ingredients(tags, ingredients, recipe)
         return recipe
 
+    @staticmethod
+    def update_ingredients(recipe, new_amounts):
+        """
+        Приводит состав рецепта к new_amounts ({ingredient_id: количество}),
+        меняя только отличающиеся строки. Возвращает прежний состав
+        ингредиентов, оставшихся в рецепте: удалённые строки списки
+        покупок учитывают сами, через сигнал post_delete.
+        """
+        links = {
+            link.ingredient_id: link
+            for link in RecipeIngredient.objects.filter(recipe=recipe)
+        }
+        old_amounts = {
+            ingredient_id: link.amount for ingredient_id, link in links.items()
+            if ingredient_id in new_amounts
+        }
+        removed = [
+            link.id for ingredient_id, link in links.items()
+            if ingredient_id not in new_amounts
+        ]
+        changed = []
+        for ingredient_id, amount in new_amounts.items():
+            link = links.get(ingredient_id)
+            if link is not None and link.amount != amount:
+                link.amount = amount
+                changed.append(link)
+        if removed:
+            RecipeIngredient.objects.filter(id__in=removed).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount
+            )
+            for ingredient_id, amount in new_amounts.items()
+            if ingredient_id not in links
+        )
+        return old_amounts
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
-        instance.tags.clear()
-        instance.ingredients.clear()
-        self.create_tags_and_ingredients(tags, ingredients, instance)
+        new_amounts = {ing['id'].id: ing['amount'] for ing in ingredients}
+        instance.tags.set(tags)
+        old_amounts = self.update_ingredients(instance, new_amounts)
+        ShopIngredients.objects.change_recipe(
+            instance, old_amounts, new_amounts
+        )
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
+        request = self.context.get('request')
+        relations = Recipe.objects.with_user_relations(
+            request and request.user
+        ).values('is_favorited', 'is_in_shopping_cart').get(pk=instance.pk)
+        for name, value in relations.items():
+            setattr(instance, name, value)
+        prefetch_related_objects(
+            [instance], 'tags', Prefetch(
+                'ingredient_links',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
         return ReadRecipeSerializer(
-            instance, context={'request': self.context.get('request')}
+            instance, context={'request': request}
         ).data
 
 
@@ -334,3 +451,11 @@ class ShopperRecipeSerializer(serializers.ModelSerializer):
         return RecipeShortSerializer(
             instance.recipes, context=self.context
         ).data
+
+
+class BatchIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_IDS_MAX
+    )
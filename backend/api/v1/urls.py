@@ -5,6 +5,7 @@ from .views import (
     IngredientViewSet,
     ProfileUserViewSet,
     RecipeViewSet,
+    RequestProfileViewSet,
     TagViewSet
 )
 
@@ -17,6 +18,9 @@ router.register('users', ProfileUserViewSet, basename='users')
 router.register('tags', TagViewSet, basename='tags')
 router.register('ingredients', IngredientViewSet, basename='ingredients')
 router.register('recipes', RecipeViewSet, basename='recipes')
+router.register(
+    'request-profiles', RequestProfileViewSet, basename='request-profiles'
+)
 
 urlpatterns = [
     path(f'{AUTH}/', include('djoser.urls.authtoken')),
@@ -1,25 +1,44 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Sum
-from django.http import HttpResponse, HttpResponseRedirect
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseRedirect,
+    StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly
 )
 from rest_framework.response import Response
 
+from backend import profiling
+from backend.constants import SHORT_LINK_MAX_AGE
 from favorites.models import FavoritesRecipes
+from recipes import shortlinks
 from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
-from shopper.models import ShopRecipes
-from subs.models import Subscriber
-
-from .filters import IngredientFilter, RecipesFilter
-from .paginations import CustomPagination
+from recipes.search import ingredient_index
+from shopper.models import ShopIngredients, ShopRecipes
+from subs.models import FeedEntry, Subscriber
+
+from .filters import RecipesFilter
+from .mixins import (
+    AnonymousResponseCacheMixin,
+    BatchRelationMixin,
+    ConditionalGetMixin,
+    SnapshotLinkMixin
+)
+from .paginations import CustomPagination, KeysetPagination
 from .permissions import IsUserOrReadOnly
+from .renderers import SHOPPING_LIST_RENDERERS
 from .serializers import (
     CreateRecipeSerializer,
     FavoritesRecipeSerializer,
@@ -36,7 +55,7 @@ from .serializers import (
 User = get_user_model()
 
 
-class ProfileUserViewSet(UserViewSet):
+class ProfileUserViewSet(BatchRelationMixin, UserViewSet):
     """
     Кастомный вьюсет для работы приложения users.
 
@@ -48,6 +67,26 @@ class ProfileUserViewSet(UserViewSet):
     http_method_names = ('get', 'post', 'put', 'delete')
     permission_classes = (IsAuthenticatedOrReadOnly,)
     pagination_class = CustomPagination
+    # Бюджеты измерены в api/tests/test_query_budgets.py для худшего
+    # случая: запрос с токеном, bump() вставляет ещё не созданные
+    # строки версий.
+    query_budgets = {
+        'list': 5,
+        'retrieve': 3,
+        'create': 5,
+        'me': 2,
+        'set_password': 4,
+        'avatar': 8,
+        'delete_avatar': 7,
+        'subscriptions': 5,
+        'get_subscriptions': 11,
+        'delete_subscriptions': 8,
+    }
+
+    def get_count_cache_scopes(self):
+        if self.action == 'subscriptions':
+            return ('users', f'subscriptions:{self.request.user.id}')
+        return ('users',)
 
     @action(
         detail=False,
@@ -83,13 +122,11 @@ class ProfileUserViewSet(UserViewSet):
         pagination_class=CustomPagination
     )
     def subscriptions(self, request):
-        user = request.user
-        subscriptions = user.subscriber.all(
-        ).order_by('-id').values('subscriptions__username')
-        subs = User.objects.filter(username__in=subscriptions)
-        page = self.paginate_queryset(subs)
+        page = self.paginate_queryset(
+            UserWithoutAuthorSerializer.get_queryset(request.user)
+        )
         serializer = UserWithoutAuthorSerializer(
-            page,
+            UserWithoutAuthorSerializer.prefetch_recipes(page, request),
             many=True,
             context={'request': request}
         )
@@ -122,33 +159,116 @@ class ProfileUserViewSet(UserViewSet):
             )
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        methods=('post', 'delete'),
+        permission_classes=(IsAuthenticated,),
+        url_path='subscribe/batch'
+    )
+    def subscribe_batch(self, request):
+        with transaction.atomic():
+            response, changed = self.batch_relations(
+                Subscriber, 'subscriptions', User.objects.all(),
+                f'subscriptions:{request.user.id}',
+                invalid=(request.user.id,)
+            )
+            if request.method == 'POST' and changed:
+                FeedEntry.objects.backfill(request.user.id, changed)
+        return response
 
-class TagViewSet(viewsets.ModelViewSet):
 
+class TagViewSet(
+    SnapshotLinkMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
+
+    snapshot_name = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     lookup_field = 'id'
     http_method_names = ('get')
     pagination_class = None
+    query_budgets = {'list': 3, 'retrieve': 3}
+
+    def get_version_scopes(self):
+        return ('tags',)
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(
+    SnapshotLinkMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
 
+    snapshot_name = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     lookup_field = 'id'
     http_method_names = ('get')
     pagination_class = None
-    filter_backends = (IngredientFilter,)
-    search_fields = ('^name',)
+    query_budgets = {'list': 3, 'retrieve': 3}
+
+    def get_version_scopes(self):
+        return ('ingredients',)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(self.search, request, *args, **kwargs)
+
+    def search(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return Response(ingredient_index.all())
+        return Response(ingredient_index.search(name))
+
+
+class RequestProfileViewSet(viewsets.ViewSet):
+    """
+    Профили запросов, снятые ProfilingMiddleware. Только для сотрудников.
+
+    В карточке профиля — отчёт pstats (?sort=cumulative|tottime|calls),
+    с ?download=1 отдаётся сам файл .prof.
+    """
+    permission_classes = (IsAdminUser,)
+    lookup_field = 'name'
+    lookup_value_regex = r'[\w-]+'
+    sort_keys = ('cumulative', 'tottime', 'calls')
+
+    def list(self, request):
+        return Response(profiling.list_profiles())
+
+    def retrieve(self, request, name=None):
+        sort = request.query_params.get('sort', 'cumulative')
+        if sort not in self.sort_keys:
+            sort = 'cumulative'
+        try:
+            if request.query_params.get('download'):
+                return FileResponse(
+                    open(profiling.get_paths(name)[0], 'rb'),
+                    as_attachment=True,
+                    filename=f'{name}.prof'
+                )
+            return Response({
+                **profiling.get_profile(name),
+                'stats': profiling.get_stats(name, sort=sort),
+            })
+        except FileNotFoundError:
+            raise Http404
 
 
 def recipe_short_link(request, short_link):
-    recipe = get_object_or_404(Recipe, short_url=short_link)
-    return HttpResponseRedirect(redirect_to=recipe.get_absolute_url(request))
+    recipe_id = shortlinks.resolve(short_link)
+    if recipe_id is None:
+        raise Http404
+    response = HttpResponseRedirect(
+        Recipe(pk=recipe_id).get_absolute_url(request)
+    )
+    patch_cache_control(response, public=True, max_age=SHORT_LINK_MAX_AGE)
+    return response
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    BatchRelationMixin,
+    ConditionalGetMixin,
+    AnonymousResponseCacheMixin,
+    viewsets.ModelViewSet
+):
 
     lookup_field = 'id'
     http_method_names = ('get', 'post', 'patch', 'delete')
@@ -156,6 +276,21 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     pagination_class = CustomPagination
     filterset_class = RecipesFilter
+    # Создание, изменение и пакетные действия делают запросы на каждый
+    # переданный тег, ингредиент или id, а удаление — на каждую связь
+    # рецепта, поэтому бюджета не имеют. Остальные бюджеты измерены
+    # в api/tests/test_query_budgets.py.
+    query_budgets = {
+        'list': 9,
+        'retrieve': 7,
+        'feed': 7,
+        'shortlink': 2,
+        'favorite': 7,
+        'delete_favorite': 10,
+        'shopping_cart': 11,
+        'delete_shopping_cart': 14,
+        'download_shopping_cart': 2,
+    }
 
     @staticmethod
     def add_to(serializer_class, request, id):
@@ -185,7 +320,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return CreateRecipeSerializer
 
     def get_queryset(self):
-        queryset = Recipe.objects.select_related('author').prefetch_related(
+        queryset = Recipe.objects.with_user_relations(
+            self.request.user
+        ).select_related('author').prefetch_related(
             Prefetch('tags', queryset=Tag.objects.only('id', 'name', 'slug')),
             Prefetch('ingredients', queryset=Ingredient.objects.only(
                 'id', 'name', 'measurement_unit')
@@ -194,12 +331,61 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 'ingredient_links',
                 queryset=RecipeIngredient.objects.select_related('ingredient')
             )
-        ).order_by('-id')
+        ).order_by('-created_at', '-id')
         return queryset
 
+    def get_version_scopes(self):
+        if self.action == 'retrieve':
+            recipe_scope = f'recipe:{self.kwargs[self.lookup_field]}'
+        else:
+            recipe_scope = 'recipes'
+        return (
+            recipe_scope, 'tags', 'ingredients', 'authors',
+            *self.get_user_version_scopes()
+        )
+
+    def get_count_cache_scopes(self):
+        params = self.request.query_params
+        user_id = self.request.user.id
+        scopes = ['recipes']
+        if 'is_favorited' in params:
+            scopes.append(f'favorites:{user_id}')
+        if 'is_in_shopping_cart' in params:
+            scopes.append(f'cart:{user_id}')
+        return scopes
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(IsAuthenticated,),
+        pagination_class=KeysetPagination
+    )
+    def feed(self, request):
+        """
+        Лента рецептов авторов, на которых подписан пользователь.
+
+        Страница выбирается из FeedEntry по курсору, затем рецепты
+        страницы загружаются одним запросом с обычными prefetch.
+        """
+        entries = self.paginate_queryset(
+            FeedEntry.objects.filter(user=request.user)
+        )
+        recipes = self.get_queryset().in_bulk(
+            [entry.recipe_id for entry in entries]
+        )
+        serializer = ReadRecipeSerializer(
+            [
+                recipes[entry.recipe_id] for entry in entries
+                if entry.recipe_id in recipes
+            ],
+            many=True,
+            context={'request': request}
+        )
+        return self.get_paginated_response(serializer.data)
+
     @action(
         detail=True,
         methods=('get',),
@@ -223,33 +409,75 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def delete_favorite(self, request, *args, **kwargs):
         return self.delete_from(FavoritesRecipes, request, self)
 
+    @action(
+        detail=False,
+        methods=('post', 'delete'),
+        permission_classes=(IsAuthenticated,),
+        url_path='favorite/batch'
+    )
+    def favorite_batch(self, request):
+        with transaction.atomic():
+            response, _ = self.batch_relations(
+                FavoritesRecipes, 'recipes', Recipe.objects.all(),
+                f'favorites:{request.user.id}'
+            )
+        return response
+
     @action(
         detail=True,
         methods=('post',),
         permission_classes=(IsAuthenticated,)
     )
     def shopping_cart(self, request, id=None):
-        return self.add_to(ShopperRecipeSerializer, request, id)
+        with transaction.atomic():
+            return self.add_to(ShopperRecipeSerializer, request, id)
 
     @shopping_cart.mapping.delete
-    def delete_shopping_cart(self, request, *args, **kwargs):
+    def delete_shopping_cart(self, request, id=None):
         return self.delete_from(ShopRecipes, request, self)
 
+    @action(
+        detail=False,
+        methods=('post', 'delete'),
+        permission_classes=(IsAuthenticated,),
+        url_path='shopping_cart/batch'
+    )
+    def shopping_cart_batch(self, request):
+        with transaction.atomic():
+            response, changed = self.batch_relations(
+                ShopRecipes, 'recipes', Recipe.objects.all(),
+                f'cart:{request.user.id}'
+            )
+            # bulk_create не отправляет сигналов, а удаление списки
+            # покупок обновляет само (см. shopper.signals).
+            if request.method == 'POST':
+                ShopIngredients.objects.add_recipes(request.user, changed)
+        return response
+
     @action(
         detail=False,
         methods=('get',),
-        permission_classes=(IsAuthenticated,)
+        permission_classes=(IsAuthenticated,),
+        renderer_classes=SHOPPING_LIST_RENDERERS
     )
     def download_shopping_cart(self, request):
         ingredients = (
-            Ingredient.objects.filter(
-                ingredients__in_shopping_cart__user=request.user)
-            .values('name', 'measurement_unit')
-            .annotate(sum=Sum('recipe_links__amount'))
+            ShopIngredients.objects.filter(user=request.user)
+            .values(
+                'amount',
+                name=F('ingredient__name'),
+                measurement_unit=F('ingredient__measurement_unit')
+            )
+            .order_by('name')
+        )
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.stream(ingredients.iterator()), content_type=content_type
         )
-        shopping_list_as_str = '\n'.join(
-            f'{ingredient["name"]} - {ingredient["sum"]} '
-            f'({ingredient["measurement_unit"]})'
-            for ingredient in ingredients
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_list.{renderer.format}"'
         )
-        return HttpResponse(shopping_list_as_str, content_type='text/plain')
+        return response
@@ -9,4 +9,34 @@ COOKING_TIME_MAX = 32000
 AMOUNT_MIN = 1
 AMOUNT_MAX = 32000
 PAGE_SIZE = 6
+RECIPES_LIMIT_MAX = 50
 SHORT_LINK_MAX_SIZE = 10
+SHORT_LINK_LENGTH = 7
+SHORT_LINK_MULTIPLIER = 2176782336049
+SHORT_LINK_OFFSET = 1234567890123
+SHORT_LINK_CACHE_SIZE = 10000
+SHORT_LINK_MAX_AGE = 60 * 5
+INGREDIENT_SEARCH_LIMIT = 20
+INGREDIENT_SEARCH_SIMILARITY = 0.3
+RECIPE_IMAGE_VARIANTS = {
+    'card': (480, 480, False),
+    'detail': (1200, 1200, False),
+}
+AVATAR_IMAGE_VARIANTS = {
+    'small': (64, 64, True),
+    'medium': (192, 192, True),
+}
+VERSION_SCOPE_MAX_LENGTH = 64
+JOB_NAME_MAX_LENGTH = 255
+JOB_KEY_MAX_LENGTH = 255
+JOB_WORKER_MAX_LENGTH = 255
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_RETRY_DELAY_MAX = 60 * 60
+JOB_POLL_INTERVAL = 1
+JOB_LOCK_TIMEOUT = 15 * 60
+JOB_KEEP_DAYS = 7
+BATCH_IDS_MAX = 100
+FEED_BACKFILL_LIMIT = 50
+FEED_BATCH_SIZE = 1000
+ADMIN_TEXT_PREVIEW_LENGTH = 80
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(model, using='default'):
+    """
+    Оценка числа строк таблицы по статистике планировщика PostgreSQL.
+
+    На других СУБД возвращает None.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+            (model._meta.db_table,)
+        )
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для админки.
+
+    Для списков без фильтров по таблицам больше
+    ESTIMATED_COUNT_THRESHOLD строк число объектов берётся из
+    статистики планировщика вместо COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        threshold = getattr(settings, 'ESTIMATED_COUNT_THRESHOLD', None)
+        query = getattr(self.object_list, 'query', None)
+        if threshold and query is not None and not query.where:
+            estimate = estimate_count(self.object_list.model)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
+
+
+class CounterFieldsMixin:
+    """
+    Модель с денормализованными счётчиками (см. api.counters).
+
+    Счётчики меняются только через UPDATE ... SET x = x ± 1, поэтому
+    save() уже загруженного объекта их не записывает: иначе сохранение
+    устаревшей копии затёрло бы изменения из других запросов.
+    """
+    counter_fields = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None:
+            update_fields = [
+                name for name in update_fields
+                if name not in self.counter_fields
+            ]
+        elif not self._state.adding:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
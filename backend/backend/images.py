@@ -0,0 +1,119 @@
+"""
+Уменьшенные копии загруженных изображений.
+
+Для каждого размера из спецификации ({имя: (ширина, высота, обрезка)})
+сохраняются WebP и JPEG рядом с оригиналом, в подкаталоге variants/.
+Пути и размеры пишутся в JSON-поле модели:
+
+    {'source': 'recipes/x.png', 'width': 2000, 'height': 1500,
+     'sizes': {'card': {'width': 480, 'height': 360,
+                        'webp': '...', 'jpeg': '...'}}}
+
+По 'source' видно, для какого файла построены копии, поэтому
+повторное сохранение модели без смены изображения ничего не делает.
+"""
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 6}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def get_variant_name(name, size, extension):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f'{stem}.{size}.{extension}')
+
+
+def _to_rgb(image):
+    """JPEG не поддерживает прозрачность: подкладываем белый фон."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _save(storage, name, image, image_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def build_variants(field_file, specs):
+    with field_file.open('rb'):
+        original = Image.open(field_file)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+    variants = {
+        'source': field_file.name,
+        'width': original.width,
+        'height': original.height,
+        'sizes': {},
+    }
+    for size, (width, height, crop) in specs.items():
+        if crop:
+            image = ImageOps.fit(original, (width, height))
+        else:
+            image = original.copy()
+            image.thumbnail((width, height))
+        rgb = _to_rgb(image)
+        entry = {'width': image.width, 'height': image.height}
+        for extension, image_format, options in FORMATS:
+            entry[extension] = _save(
+                field_file.storage,
+                get_variant_name(field_file.name, size, extension),
+                image if extension == 'webp' else rgb,
+                image_format,
+                options
+            )
+        variants['sizes'][size] = entry
+    return variants
+
+
+def delete_variants(storage, variants):
+    for entry in (variants or {}).get('sizes', {}).values():
+        for extension, *_ in FORMATS:
+            if entry.get(extension):
+                storage.delete(entry[extension])
+
+
+def is_stale(field_file, variants):
+    """Построены ли копии не для текущего файла поля."""
+    return (variants or {}).get('source') != (field_file.name or None)
+
+
+def refresh_variants(instance, image_field, variants_field, specs):
+    """
+    Перестраивает копии, если изображение instance сменилось.
+
+    Новое значение сохраняется через save(update_fields=...), чтобы
+    сработали обработчики, сбрасывающие версии кешей. Версии хранятся
+    в базе, поэтому задача из воркера сбрасывает кеши ответов и ETag
+    и в веб-процессах.
+    """
+    field_file = getattr(instance, image_field)
+    current = getattr(instance, variants_field) or {}
+    if not is_stale(field_file, current):
+        return
+    delete_variants(field_file.storage, current)
+    variants = {}
+    if field_file:
+        try:
+            variants = build_variants(field_file, specs)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.exception('Не удалось обработать %s', field_file.name)
+            variants = {'source': field_file.name, 'sizes': {}}
+    setattr(instance, variants_field, variants)
+    instance.save(update_fields=(variants_field,))
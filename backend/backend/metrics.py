@@ -0,0 +1,246 @@
+"""
+Метрики в текстовом формате Prometheus без внешних зависимостей.
+
+Каждый процесс gunicorn копит значения в памяти и раз в
+METRICS_FLUSH_INTERVAL секунд сбрасывает их в свой файл
+<METRICS_DIR>/<pid>.json. Эндпоинт /metrics складывает файлы всех
+процессов, поэтому не важно, какой воркер принял запрос Prometheus.
+Файлы завершившихся процессов остаются и продолжают учитываться:
+счётчики не уменьшаются, пока каталог не очищен.
+
+Пустой METRICS_DIR отключает сбор метрик.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+METRICS = {
+    'foodgram_http_requests_total': (
+        COUNTER, 'Ответы по view, методу и статусу'
+    ),
+    'foodgram_http_request_duration_seconds': (
+        HISTOGRAM, 'Время обработки запроса'
+    ),
+    'foodgram_db_queries': (
+        HISTOGRAM, 'SQL-запросов на один HTTP-запрос'
+    ),
+    'foodgram_db_duration_seconds_total': (
+        COUNTER, 'Время выполнения SQL-запросов'
+    ),
+    'foodgram_serialize_duration_seconds_total': (
+        COUNTER, 'Время сериализации и рендеринга ответов'
+    ),
+    'foodgram_cache_requests_total': (
+        COUNTER, 'Обращения к кешам по результату: hit или miss'
+    ),
+}
+BUCKETS = {
+    'foodgram_http_request_duration_seconds': DURATION_BUCKETS,
+    'foodgram_db_queries': QUERY_BUCKETS,
+}
+
+
+class Registry:
+    """Значения метрик текущего процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.flushed_at = time.monotonic()
+
+    @staticmethod
+    def get_key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[self.get_key(name, labels)] += value
+
+    def observe(self, name, value, **labels):
+        key = self.get_key(name, labels)
+        buckets = BUCKETS[name]
+        with self.lock:
+            # Счётчики корзин, затем сумма и число наблюдений.
+            histogram = self.histograms.setdefault(
+                key, [0] * (len(buckets) + 2)
+            )
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def dump(self):
+        with self.lock:
+            return {
+                'counters': [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, dict(labels), values]
+                    for (name, labels), values in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force=False):
+        directory = get_directory()
+        if not directory or not (self.counters or self.histograms):
+            return
+        now = time.monotonic()
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if not force and now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+                json.dump(self.dump(), file)
+            os.replace(f'{path}.tmp', path)
+        except OSError:
+            logger.exception('Не удалось записать метрики в %s', path)
+
+
+registry = Registry()
+atexit.register(registry.flush, force=True)
+
+
+def get_directory():
+    return getattr(settings, 'METRICS_DIR', '')
+
+
+def is_enabled():
+    return bool(get_directory())
+
+
+def inc(name, value=1, **labels):
+    if is_enabled():
+        registry.inc(name, value, **labels)
+        registry.flush()
+
+
+def observe(name, value, **labels):
+    if is_enabled():
+        registry.observe(name, value, **labels)
+        registry.flush()
+
+
+def record_cache(cache_name, hit):
+    inc(
+        'foodgram_cache_requests_total',
+        cache=cache_name, result='hit' if hit else 'miss'
+    )
+
+
+def collect():
+    """Складывает значения из файлов всех процессов."""
+    registry.flush(force=True)
+    counters = defaultdict(float)
+    histograms = {}
+    for path in glob.glob(os.path.join(get_directory(), '*.json')):
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data['counters']:
+            counters[Registry.get_key(name, labels)] += value
+        for name, labels, values in data['histograms']:
+            key = Registry.get_key(name, labels)
+            if key not in histograms:
+                histograms[key] = [0] * len(values)
+            histograms[key] = [
+                total + value
+                for total, value in zip(histograms[key], values)
+            ]
+    return counters, histograms
+
+
+def _escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _format_labels(labels, **extra):
+    labels = (*labels, *extra.items())
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+def render():
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == COUNTER:
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(
+                        f'{name}{_format_labels(labels)} '
+                        f'{_format_value(value)}'
+                    )
+            continue
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(BUCKETS[name], values):
+                lines.append(
+                    f'{name}_bucket{_format_labels(labels, le=bound)} '
+                    f'{_format_value(count)}'
+                )
+            lines.append(
+                f'{name}_bucket{_format_labels(labels, le="+Inf")} '
+                f'{_format_value(values[-1])}'
+            )
+            lines.append(
+                f'{name}_sum{_format_labels(labels)} '
+                f'{_format_value(values[-2])}'
+            )
+            lines.append(
+                f'{name}_count{_format_labels(labels)} '
+                f'{_format_value(values[-1])}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    /metrics для Prometheus.
+
+    nginx этот путь не проксирует: метрики доступны только внутри
+    сети контейнеров по адресу backend:8000/metrics.
+    """
+    if not is_enabled():
+        return HttpResponse('Сбор метрик отключён\n', status=404)
+    return HttpResponse(
+        render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,277 @@
+"""
+Учёт SQL-запросов на каждый HTTP-запрос.
+
+QueryBudgetMiddleware через connection.execute_wrapper считает запросы
+и время в базе, добавляет в ответ заголовок Server-Timing:
+
+    Server-Timing: db;dur=4.1;desc="7 queries", serialize;dur=2.3,
+                   total;dur=7.9
+
+serialize — время от входа во view до готового тела ответа без
+времени в базе: для API это в основном сериализаторы и рендерер.
+
+Тело потокового ответа (StreamingHttpResponse) формируется уже после
+выхода из view, поэтому его запросы считаются, а бюджет проверяется
+после отдачи тела. Server-Timing у таких ответов нет: заголовки
+уходят клиенту раньше, чем становится известно время.
+
+Вьюсеты объявляют бюджеты по действиям:
+
+    query_budgets = {'list': 6, 'retrieve': 5}
+
+Превышение бюджета пишется в лог, а при QUERY_BUDGET_RAISE (по
+умолчанию включён вместе с DEBUG) запрос завершается ошибкой
+QueryBudgetExceeded со списком выполненных запросов. Потоковые ответы
+ошибкой не прерываются: статус и часть тела к этому моменту уже
+отправлены, и клиент получил бы обрезанный файл, поэтому превышение
+только пишется в лог вместе с запросами.
+
+MetricsMiddleware по тем же замерам ведёт метрики для /metrics
+(см. backend.metrics), поэтому стоит в MIDDLEWARE раньше.
+ProfilingMiddleware по запросу сотрудника выполняет запрос под
+cProfile (см. backend.profiling).
+"""
+import cProfile
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import metrics, profiling
+
+logger = logging.getLogger(__name__)
+
+
+TRANSACTION_STATEMENTS = (
+    'BEGIN', 'SAVEPOINT ', 'RELEASE SAVEPOINT ', 'ROLLBACK TO SAVEPOINT '
+)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryStats:
+    """
+    Обёртка execute_wrapper: число запросов, время и сами запросы.
+
+    Управление транзакциями в счёт не входит: BEGIN SQLite драйвер
+    PostgreSQL не отправляет отдельным запросом, а точки сохранения
+    в тестах (TestCase) появляются там, где в работе их нет. Так
+    бюджеты совпадают на разных СУБД и в тестах.
+    """
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.keep_sql = keep_sql
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            if not sql.startswith(TRANSACTION_STATEMENTS):
+                self.count += 1
+                if self.keep_sql:
+                    self.queries.append(sql)
+
+
+def get_query_budget(view_func, method):
+    """Бюджет действия вьюсета, в который попал запрос, или None."""
+    budgets = getattr(getattr(view_func, 'cls', None), 'query_budgets', None)
+    actions = getattr(view_func, 'actions', None)
+    if not budgets or not actions:
+        return None, None
+    action = actions.get(method.lower())
+    return action, budgets.get(action)
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.raise_on_excess = getattr(
+            settings, 'QUERY_BUDGET_RAISE', settings.DEBUG
+        )
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        stats = QueryStats(keep_sql=self.raise_on_excess)
+        request.query_stats = stats
+        request.query_budget = None
+        request.view_started = None
+        request.skip_query_budget = False
+        with ExitStack() as stack:
+            self.track(stack, stats)
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, stats, started
+            )
+            return response
+        timings = self.finish(request, stats, started)
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.1f}' + (
+                f';desc="{stats.count} queries"' if name == 'db' else ''
+            )
+            for name, duration in timings.items()
+        )
+        self.check_budget(request, stats)
+        return response
+
+    @staticmethod
+    def track(stack, stats):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+
+    def stream(self, content, request, stats, started):
+        with ExitStack() as stack:
+            self.track(stack, stats)
+            yield from content
+        self.finish(request, stats, started)
+        self.check_budget(request, stats, streaming=True)
+
+    @staticmethod
+    def finish(request, stats, started):
+        finished = time.perf_counter()
+        request.timings = timings = {'db': stats.duration}
+        if request.view_started is not None:
+            view_started, db_before = request.view_started
+            timings['serialize'] = max(
+                finished - view_started - (stats.duration - db_before), 0
+            )
+        timings['total'] = finished - started
+        return timings
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.view_started = (
+            time.perf_counter(), request.query_stats.duration
+        )
+        request.query_budget = get_query_budget(view_func, request.method)
+
+    def check_budget(self, request, stats, streaming=False):
+        action, budget = request.query_budget or (None, None)
+        if (
+            budget is None or stats.count <= budget
+            or request.skip_query_budget
+        ):
+            return
+        message = '\n'.join((
+            f'{request.method} {request.path} ({action}): '
+            f'{stats.count} SQL-запросов при бюджете {budget}',
+            *stats.queries
+        ))
+        if self.raise_on_excess and not streaming:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        if not metrics.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, response, started
+            )
+        else:
+            self.observe(request, response, started)
+        return response
+
+    def stream(self, content, request, response, started):
+        try:
+            yield from content
+        finally:
+            self.observe(request, response, started)
+
+    @staticmethod
+    def observe(request, response, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.inc(
+            'foodgram_http_requests_total',
+            view=view, method=request.method, status=response.status_code
+        )
+        metrics.observe(
+            'foodgram_http_request_duration_seconds', duration,
+            view=view, method=request.method
+        )
+        stats = getattr(request, 'query_stats', None)
+        if stats is not None:
+            metrics.observe('foodgram_db_queries', stats.count, view=view)
+            metrics.inc(
+                'foodgram_db_duration_seconds_total', stats.duration,
+                view=view
+            )
+        serialize = getattr(request, 'timings', {}).get('serialize')
+        if serialize is not None:
+            metrics.inc(
+                'foodgram_serialize_duration_seconds_total', serialize,
+                view=view
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Стоит после AuthenticationMiddleware: сотрудник определяется по
+    сессии или, для запросов к API, по токену.
+    """
+
+    def __init__(self, get_response):
+        if not profiling.get_directory():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 1.0)
+
+    @staticmethod
+    def is_staff(request):
+        if request.user.is_authenticated:
+            return request.user.is_staff
+        # Поиск токена — лишний для view запрос, бюджет на него не
+        # рассчитан.
+        request.skip_query_budget = True
+        try:
+            result = TokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return result is not None and result[0].is_staff
+
+    def __call__(self, request):
+        if (
+            not profiling.is_requested(request)
+            or random.random() >= self.sample_rate
+            or not self.is_staff(request)
+        ):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        response = profile.runcall(self.get_response, request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        stats = getattr(request, 'query_stats', None)
+        response['X-Profile-Id'] = profiling.save(profile, {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else None,
+            'user_id': getattr(request.user, 'id', None),
+            'status': response.status_code,
+            'duration': duration,
+            'queries': stats.count if stats is not None else None,
+        })
+        return response
@@ -0,0 +1,117 @@
+"""
+Профилирование отдельных запросов по требованию.
+
+Сотрудник (is_staff) добавляет к запросу заголовок X-Profile: 1 или
+параметр ?_profile=1, и ProfilingMiddleware выполняет запрос под
+cProfile. Результат сохраняется в PROFILING_DIR двумя файлами:
+
+    <имя>.prof — статистика pstats (snakeviz, python -m pstats);
+    <имя>.json — метод, путь, view, пользователь, статус, время
+                 и число SQL-запросов.
+
+Имя профиля возвращается в заголовке X-Profile-Id. Самые старые
+профили удаляются, когда их больше PROFILING_MAX_FILES или они
+занимают больше PROFILING_MAX_BYTES.
+"""
+import io
+import json
+import os
+import pstats
+import re
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = '_profile'
+NAME_PATTERN = re.compile(r'^[\w-]+$')
+
+
+def get_directory():
+    return getattr(settings, 'PROFILING_DIR', '')
+
+
+def is_requested(request):
+    return get_directory() and (
+        request.META.get(HEADER) == '1'
+        or request.GET.get(QUERY_PARAM) == '1'
+    )
+
+
+def get_paths(name):
+    if not NAME_PATTERN.match(name):
+        raise FileNotFoundError(name)
+    base = os.path.join(get_directory(), name)
+    return f'{base}.prof', f'{base}.json'
+
+
+def save(profile, metadata):
+    """Сохраняет профиль и его описание, возвращает имя профиля."""
+    directory = get_directory()
+    os.makedirs(directory, exist_ok=True)
+    created_at = timezone.now()
+    name = f'{created_at:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}'
+    profile_path, metadata_path = get_paths(name)
+    profile.dump_stats(profile_path)
+    with open(metadata_path, 'w', encoding='utf-8') as file:
+        json.dump({
+            'name': name,
+            'created_at': created_at.isoformat(),
+            'size': os.path.getsize(profile_path),
+            **metadata,
+        }, file, ensure_ascii=False)
+    enforce_limits()
+    return name
+
+
+def list_profiles():
+    """Описания сохранённых профилей, от новых к старым."""
+    directory = get_directory()
+    if not directory or not os.path.isdir(directory):
+        return []
+    profiles = []
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(
+                os.path.join(directory, filename), encoding='utf-8'
+            ) as file:
+                profiles.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda item: item['name'], reverse=True)
+
+
+def get_profile(name):
+    with open(get_paths(name)[1], encoding='utf-8') as file:
+        return json.load(file)
+
+
+def get_stats(name, sort='cumulative', limit=40):
+    """Текстовый отчёт pstats по самым затратным функциям."""
+    stream = io.StringIO()
+    stats = pstats.Stats(get_paths(name)[0], stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def delete(name):
+    for path in get_paths(name):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def enforce_limits():
+    max_files = getattr(settings, 'PROFILING_MAX_FILES', None)
+    max_bytes = getattr(settings, 'PROFILING_MAX_BYTES', None)
+    profiles = list_profiles()
+    total = sum(item.get('size', 0) for item in profiles)
+    while profiles and (
+        (max_files and len(profiles) > max_files)
+        or (max_bytes and total > max_bytes)
+    ):
+        oldest = profiles.pop()
+        total -= oldest.get('size', 0)
+        delete(oldest['name'])
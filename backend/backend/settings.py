@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
 from django.core.management.utils import get_random_secret_key
@@ -49,15 +50,19 @@ INSTALLED_APPS = [
     'subs.apps.SubsConfig',
     'recipes.apps.RecipesConfig',
     'favorites.apps.FavoritesConfig',
-    'shopper.apps.ShopperConfig'
+    'shopper.apps.ShopperConfig',
+    'jobs.apps.JobsConfig'
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.MetricsMiddleware',
+    'backend.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -144,8 +149,81 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Статические снимки справочников тегов и ингредиентов, раздаются nginx
+SNAPSHOT_URL = '/snapshots/'
+
+SNAPSHOT_ROOT = os.getenv('SNAPSHOT_ROOT', os.path.join(BASE_DIR, 'snapshots'))
+
 AUTH_USER_MODEL = 'users.Profile'
 
+# Кеш может быть локальным для процесса: ключи строятся из версий данных,
+# которые хранятся в базе (см. backend.versions)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Сколько секунд хранится закешированное число объектов для пагинации
+COUNT_CACHE_TIMEOUT = int(os.getenv('COUNT_CACHE_TIMEOUT', 300))
+
+# Сколько секунд хранятся готовые ответы для анонимных запросов к рецептам
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 600))
+
+# С какого числа строк списки без фильтров считаются по оценке
+# планировщика PostgreSQL, а не через COUNT(*); пусто — не оценивать
+ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv('ESTIMATED_COUNT_THRESHOLD', 0)
+) or None
+
+# Через сколько секунд индекс поиска ингредиентов перечитывается из базы,
+# даже если версия справочника не менялась (правки в обход сигналов)
+INGREDIENT_INDEX_TTL = int(os.getenv('INGREDIENT_INDEX_TTL', 300))
+
+# Как часто (в секундах) индекс поиска ингредиентов сверяет свою версию
+# справочника с базой, чтобы увидеть правки из других процессов
+INGREDIENT_INDEX_CHECK_INTERVAL = int(
+    os.getenv('INGREDIENT_INDEX_CHECK_INTERVAL', 5)
+)
+
+# TrueType-шрифт с кириллицей для выгрузки списка покупок в PDF
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    'SHOPPING_LIST_PDF_FONT',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+# Выполнять фоновые задачи сразу после фиксации транзакции, без воркера
+JOBS_EAGER = os.getenv('JOBS_EAGER', 'False') == 'True'
+
+# Завершать ошибкой запросы, превысившие бюджет SQL-запросов вьюсета;
+# без этого превышения только пишутся в лог
+QUERY_BUDGET_RAISE = os.getenv(
+    'QUERY_BUDGET_RAISE', str(DEBUG)
+) == 'True'
+
+# Каталог, через который процессы gunicorn складывают метрики для
+# /metrics; пусто — метрики не собираются
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'foodgram-metrics')
+)
+
+# Как часто, в секундах, процесс сбрасывает свои метрики в METRICS_DIR
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+
+# Куда сохраняются профили запросов, запрошенных сотрудниками
+# заголовком X-Profile: 1 или параметром ?_profile=1; пусто — отключено
+PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+# Доля таких запросов, которые действительно профилируются
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 1.0))
+
+# Сколько профилей и байт хранить: самые старые удаляются
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', 100))
+PROFILING_MAX_BYTES = int(os.getenv('PROFILING_MAX_BYTES', 100 * 1024 ** 2))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,74 @@
+"""
+Версии наборов данных для инвалидации кешей.
+
+Версия — время последнего изменения области данных ('recipes',
+'favorites:<user_id>' и т. п.), хранится в таблице api.Version, общей
+для веб-процессов, воркера задач и команд manage.py. Ключи кешей и
+ETag строятся из версий, поэтому запись в базу из любого процесса
+делает старые ключи недостижимыми без поиска и удаления по шаблону,
+а сами кеши могут оставаться локальными для процесса.
+
+Во время HTTP-запроса прочитанные версии запоминаются, и ETag, кеш
+ответа и кеш числа объектов обходятся одним запросом к таблице.
+"""
+import threading
+from time import time
+
+from django.core.signals import request_finished, request_started
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from api.models import Version
+
+# На сколько версия растёт как минимум: часы процессов могут
+# расходиться, а новая версия должна отличаться от старой и быть
+# больше неё.
+MIN_STEP = 0.001
+
+_local = threading.local()
+
+
+def _start_request(**kwargs):
+    _local.versions = {}
+
+
+def _finish_request(**kwargs):
+    _local.versions = None
+
+
+request_started.connect(_start_request)
+request_finished.connect(_finish_request)
+
+
+def get_versions(*scopes):
+    """
+    Версии областей scopes. Область, которую ещё ни разу не меняли,
+    имеет версию 0: строка появляется при первом bump().
+    """
+    known = getattr(_local, 'versions', None)
+    if known is None:
+        known = {}
+    missing = [scope for scope in dict.fromkeys(scopes) if scope not in known]
+    if missing:
+        found = dict(
+            Version.objects.filter(scope__in=missing)
+            .values_list('scope', 'value')
+        )
+        known.update((scope, found.get(scope, 0)) for scope in missing)
+    return tuple(known[scope] for scope in scopes)
+
+
+def bump(*scopes):
+    now = time()
+    updated = Version.objects.filter(scope__in=scopes).update(
+        value=Greatest(Value(now), F('value') + MIN_STEP)
+    )
+    if updated < len(set(scopes)):
+        Version.objects.bulk_create(
+            [Version(scope=scope, value=now) for scope in set(scopes)],
+            ignore_conflicts=True
+        )
+    known = getattr(_local, 'versions', None)
+    if known:
+        for scope in scopes:
+            known.pop(scope, None)
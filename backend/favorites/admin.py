@@ -1,5 +1,16 @@
 from django.contrib import admin
 
+from backend.db import EstimatedCountPaginator
 from .models import FavoritesRecipes
 
-admin.site.register(FavoritesRecipes)
+
+class FavoritesRecipesAdmin(admin.ModelAdmin):
+    list_display = ('user', 'recipes')
+    list_select_related = ('user', 'recipes__author')
+    autocomplete_fields = ('user', 'recipes')
+    search_fields = ('user__username', 'recipes__name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+admin.site.register(FavoritesRecipes, FavoritesRecipesAdmin)
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'status', 'attempts', 'run_at', 'finished_at', 'locked_by'
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'key')
+    readonly_fields = ('created_at', 'locked_at', 'finished_at', 'last_error')
+    actions = ('retry',)
+
+    @admin.action(description='Повторить задачи с ошибкой')
+    def retry(self, request, queryset):
+        for job in queryset.filter(status=Job.FAILED):
+            Job.objects.enqueue(
+                job.name, job.args, job.kwargs,
+                key=job.key, max_attempts=job.max_attempts
+            )
@@ -0,0 +1,54 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from backend.constants import JOB_POLL_INTERVAL
+from jobs.models import Job
+from jobs.registry import get_periodic_tasks
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркер фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=JOB_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        Job.objects.schedule_periodic(get_periodic_tasks())
+        self.stdout.write(f'Воркер {worker} запущен')
+        while not self.stopping:
+            close_old_connections()
+            Job.objects.release_stale()
+            job = Job.objects.claim(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            started = time.monotonic()
+            status = job.execute()
+            self.stdout.write(
+                f'{job.name} #{job.pk}: {job.get_status_display()} '
+                f'за {time.monotonic() - started:.2f} с'
+            )
+            if status == Job.PENDING:
+                self.stderr.write(job.last_error)
+        self.stdout.write(f'Воркер {worker} остановлен')
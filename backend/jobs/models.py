@@ -0,0 +1,191 @@
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from backend.constants import (
+    JOB_KEY_MAX_LENGTH,
+    JOB_LOCK_TIMEOUT,
+    JOB_MAX_ATTEMPTS,
+    JOB_NAME_MAX_LENGTH,
+    JOB_RETRY_DELAY,
+    JOB_RETRY_DELAY_MAX,
+    JOB_WORKER_MAX_LENGTH
+)
+from .registry import registry
+
+
+class JobQuerySet(models.QuerySet):
+
+    def enqueue(self, name, args=(), kwargs=None, run_at=None, key='',
+                max_attempts=JOB_MAX_ATTEMPTS):
+        job = Job(
+            name=name,
+            args=list(args),
+            kwargs=kwargs or {},
+            run_at=run_at or timezone.now(),
+            key=key,
+            max_attempts=max_attempts
+        )
+        if not key:
+            job.save()
+            return job
+        try:
+            with transaction.atomic():
+                job.save()
+        except IntegrityError:
+            return self.filter(key=key, status=Job.PENDING).first()
+        return job
+
+    def claim(self, worker):
+        """
+        Забирает одну готовую к запуску задачу.
+
+        SKIP LOCKED позволяет нескольким воркерам разбирать очередь
+        параллельно, не дожидаясь чужих блокировок.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            job = self.select_for_update(skip_locked=True).filter(
+                status=Job.PENDING, run_at__lte=now
+            ).order_by('run_at', 'id').first()
+            if job is None:
+                return None
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_at = now
+            job.locked_by = worker
+            job.save(update_fields=(
+                'status', 'attempts', 'locked_at', 'locked_by'
+            ))
+        return job
+
+    def release_stale(self, timeout=JOB_LOCK_TIMEOUT):
+        """Возвращает в очередь задачи, чей воркер пропал."""
+        return self.filter(
+            status=Job.RUNNING,
+            locked_at__lt=timezone.now() - timedelta(seconds=timeout)
+        ).update(status=Job.PENDING, locked_at=None, locked_by='')
+
+    def schedule_periodic(self, tasks):
+        for item in tasks:
+            if not self.filter(
+                key=item.get_periodic_key(),
+                status__in=(Job.PENDING, Job.RUNNING)
+            ).exists():
+                self.enqueue(
+                    item.name,
+                    key=item.get_periodic_key(),
+                    max_attempts=item.max_attempts
+                )
+
+    def purge(self, before):
+        return self.filter(
+            status__in=(Job.DONE, Job.FAILED), finished_at__lt=before
+        ).delete()[0]
+
+
+class Job(models.Model):
+    """Фоновая задача в очереди на выполнение воркером run_worker."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=JOB_NAME_MAX_LENGTH)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    kwargs = models.JSONField(
+        'Именованные аргументы', default=dict, blank=True
+    )
+    key = models.CharField(
+        'Ключ', max_length=JOB_KEY_MAX_LENGTH, blank=True,
+        help_text='Одновременно в очереди может ждать одна задача с ключом'
+    )
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=JOB_MAX_ATTEMPTS
+    )
+    run_at = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    locked_by = models.CharField(
+        'Воркер', max_length=JOB_WORKER_MAX_LENGTH, blank=True
+    )
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создана', auto_now_add=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=('status', 'run_at'), name='job_status_run_at_idx'
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(status='pending') & ~models.Q(key=''),
+                name='job_pending_key_unique'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+    def get_retry_delay(self):
+        """Экспоненциальная задержка: 10 с, 20 с, 40 с... не больше часа."""
+        return min(
+            JOB_RETRY_DELAY * 2 ** (self.attempts - 1), JOB_RETRY_DELAY_MAX
+        )
+
+    def execute(self):
+        item = registry.get(self.name)
+        try:
+            if item is None:
+                raise LookupError(f'Задача {self.name} не зарегистрирована')
+            item.func(*self.args, **self.kwargs)
+        except Exception:
+            self.last_error = traceback.format_exc()
+            if self.attempts >= self.max_attempts:
+                self.status = Job.FAILED
+                self.finished_at = timezone.now()
+            else:
+                self.status = Job.PENDING
+                self.run_at = timezone.now() + timedelta(
+                    seconds=self.get_retry_delay()
+                )
+        else:
+            self.status = Job.DONE
+            self.finished_at = timezone.now()
+        self.locked_at = None
+        self.locked_by = ''
+        fields = (
+            'status', 'run_at', 'finished_at', 'last_error',
+            'locked_at', 'locked_by'
+        )
+        try:
+            with transaction.atomic():
+                self.save(update_fields=fields)
+        except IntegrityError:
+            # Пока задача выполнялась, в очередь встала такая же
+            # с тем же ключом: повтор сделает она.
+            self.status = Job.FAILED
+            self.finished_at = timezone.now()
+            self.save(update_fields=fields)
+        if item is not None and item.every and self.status != Job.PENDING:
+            item.enqueue(delay=item.every, key=item.get_periodic_key())
+        return self.status
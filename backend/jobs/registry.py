@@ -0,0 +1,82 @@
+"""
+Регистрация фоновых задач.
+
+Функция, обёрнутая в @task, остаётся обычной функцией, но получает
+методы delay() и enqueue(), которые кладут вызов в таблицу Job.
+Задачи ищутся в модулях tasks.py приложений при запуске Django.
+
+    @task(max_attempts=3)
+    def build_snapshot(name):
+        ...
+
+    build_snapshot.delay('tags')
+
+Аргументы хранятся в JSON, поэтому передавать нужно id, а не объекты.
+Задача с every=секунды периодическая: воркер ставит её при запуске
+и после каждого выполнения переносит на every секунд вперёд.
+"""
+from datetime import timedelta
+from functools import partial, update_wrapper
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from backend.constants import JOB_MAX_ATTEMPTS
+
+registry = {}
+
+
+class Task:
+
+    def __init__(self, func, name, max_attempts, every):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.every = every
+        update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, delay=None, key=''):
+        """
+        Ставит задачу в очередь; delay — через сколько секунд выполнить.
+
+        Пока в очереди ждёт задача с тем же непустым key, новая не
+        создаётся и возвращается ожидающая. При JOBS_EAGER задача
+        выполняется сразу после фиксации транзакции, без воркера.
+        """
+        kwargs = kwargs or {}
+        if getattr(settings, 'JOBS_EAGER', False):
+            transaction.on_commit(partial(self.func, *args, **kwargs))
+            return None
+        from .models import Job
+
+        return Job.objects.enqueue(
+            self.name,
+            args=list(args),
+            kwargs=kwargs,
+            run_at=timezone.now() + timedelta(seconds=delay or 0),
+            key=key,
+            max_attempts=self.max_attempts
+        )
+
+    def get_periodic_key(self):
+        return f'periodic:{self.name}'
+
+
+def task(func=None, *, name=None, max_attempts=JOB_MAX_ATTEMPTS, every=None):
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        registry[task_name] = Task(func, task_name, max_attempts, every)
+        return registry[task_name]
+
+    return decorator(func) if func is not None else decorator
+
+
+def get_periodic_tasks():
+    return [item for item in registry.values() if item.every]
@@ -0,0 +1,13 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from backend.constants import JOB_KEEP_DAYS
+from .models import Job
+from .registry import task
+
+
+@task(every=60 * 60 * 24)
+def purge_jobs():
+    """Удаляет завершённые задачи старше JOB_KEEP_DAYS дней."""
+    Job.objects.purge(timezone.now() - timedelta(days=JOB_KEEP_DAYS))
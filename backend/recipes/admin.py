@@ -1,41 +1,65 @@
 from django.contrib import admin
+from django.utils.text import Truncator
 
+from backend.constants import ADMIN_TEXT_PREVIEW_LENGTH
+from backend.db import EstimatedCountPaginator
 from .models import Ingredient, Recipe, RecipeIngredient, Tag
 
 
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
 
 
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
     search_fields = ('name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class RecipeIngredientInLine(admin.StackedInline):
     model = RecipeIngredient
     extra = 0
     min_num = 1
+    autocomplete_fields = ('ingredient',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'recipe__author', 'ingredient'
+        )
+
+
+class RecipeIngredientAdmin(admin.ModelAdmin):
+    list_display = ('recipe', 'ingredient', 'amount')
+    list_select_related = ('recipe__author', 'ingredient')
+    autocomplete_fields = ('recipe', 'ingredient')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class RecipeAdmin(admin.ModelAdmin):
     inlines = (RecipeIngredientInLine,)
     search_fields = ('name', 'author__username')
-    filter_horizontal = ('tags', 'ingredients')
+    autocomplete_fields = ('author', 'tags')
     list_filter = ('tags',)
+    list_select_related = ('author',)
     list_display = (
         'name',
         'author',
-        'text',
-        'is_favorite_count'
+        'short_text',
+        'favorites_count',
+        'in_cart_count'
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-    def is_favorite_count(self, obj):
-        return obj.favorites.count() if hasattr(obj, 'favorites') else 0
-    is_favorite_count.short_description = 'В избранном'
+    @admin.display(description='Описание')
+    def short_text(self, obj):
+        return Truncator(obj.text).chars(ADMIN_TEXT_PREVIEW_LENGTH)
 
 
 admin.site.register(Tag, TagAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
-admin.site.register(RecipeIngredient)
+admin.site.register(RecipeIngredient, RecipeIngredientAdmin)
 admin.site.register(Recipe, RecipeAdmin)
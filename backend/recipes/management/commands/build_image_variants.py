@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from backend.constants import AVATAR_IMAGE_VARIANTS, RECIPE_IMAGE_VARIANTS
+from backend.images import refresh_variants
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии изображений рецептов и аватаров.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить копии и для уже обработанных изображений'
+        )
+
+    def handle(self, *args, **options):
+        targets = (
+            (Recipe, 'image', 'image_variants', RECIPE_IMAGE_VARIANTS),
+            (User, 'avatar', 'avatar_variants', AVATAR_IMAGE_VARIANTS),
+        )
+        for model, image_field, variants_field, specs in targets:
+            queryset = model.objects.exclude(
+                **{f'{image_field}__isnull': True}
+            ).exclude(**{image_field: ''})
+            if not options['force']:
+                queryset = queryset.exclude(
+                    **{f'{variants_field}__has_key': 'source'}
+                )
+            count = 0
+            for instance in queryset.iterator():
+                if options['force']:
+                    setattr(instance, variants_field, {})
+                refresh_variants(instance, image_field, variants_field, specs)
+                count += 1
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обработано {count}'
+            ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Собирает статические снимки тегов и ингредиентов.'
+
+    def handle(self, *args, **options):
+        for filename in snapshots.build_all():
+            self.stdout.write(self.style.SUCCESS(f'Записан {filename}'))
@@ -1,38 +1,100 @@
 import csv
+import json
+import os
+import time
 
-from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
-from backend import settings
+from backend.constants import (
+    INGREDIENT_NAME_MAX_LENGTH,
+    MEASUREMENT_UNIT_MAX_LENGTH
+)
+from backend.versions import bump
+from recipes import snapshots
 from recipes.models import Ingredient
 
+BATCH_SIZE = 5000
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+def read_json(file):
+    for item in json.load(file):
+        yield item['name'], item['measurement_unit']
+
 
 class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты из CSV (название, единица измерения) '
+        'или JSON-списка, как в data/ingredients.json.'
+    )
 
     def add_arguments(self, parser):
-        parser.add_argument('--path', type=str, help='Path to file')
+        parser.add_argument(
+            '--path', type=str,
+            default=os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv'),
+            help='Путь к файлу .csv или .json'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько строк вставлять одним запросом'
+        )
 
     def handle(self, *args, **options):
-        success_count = 0
-        with open(
-                f'{settings.BASE_DIR}/data/ingredients.csv',
-                'r',
-                encoding='utf-8',
-        ) as csv_file:
-            reader = csv.reader(csv_file)
-
-            for row in reader:
-                name_csv = 0
-                unit_csv = 1
-                try:
-                    obj, created = Ingredient.objects.get_or_create(
-                        name=row[name_csv],
-                        measurement_unit=row[unit_csv],
-                    )
-                    if created:
-                        success_count += 1
-                    if not created:
-                        print(f'Ингредиенты {obj} уже есть в базе данных')
-                except IntegrityError as err:
-                    print(f'Ошибка {row}: {err}')
-        print(f'{success_count} ингредиентов было импортировано')
+        path = options['path']
+        reader = read_json if path.endswith('.json') else read_csv
+        started = time.monotonic()
+        seen = set(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+        total = skipped = 0
+        batch = []
+        try:
+            file = open(path, encoding='utf-8')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+        with file, transaction.atomic():
+            # Строки, которые параллельно добавил кто-то другой,
+            # bulk_create с ignore_conflicts пропускает молча, поэтому
+            # добавленные считаются по таблице.
+            before = Ingredient.objects.count()
+            for name, measurement_unit in reader(file):
+                total += 1
+                key = (name.strip(), measurement_unit.strip())
+                if key in seen:
+                    continue
+                if (
+                    not all(key)
+                    or len(key[0]) > INGREDIENT_NAME_MAX_LENGTH
+                    or len(key[1]) > MEASUREMENT_UNIT_MAX_LENGTH
+                ):
+                    skipped += 1
+                    self.stderr.write(f'Пропущена строка {total}: {key}')
+                    continue
+                seen.add(key)
+                batch.append(Ingredient(name=key[0], measurement_unit=key[1]))
+                if len(batch) >= options['batch_size']:
+                    self.insert(batch)
+                    batch = []
+            self.insert(batch)
+            created = Ingredient.objects.count() - before
+        if created:
+            bump('ingredients')
+            snapshots.schedule('ingredients')
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано строк: {total}, добавлено: {created}, '
+            f'повторов: {total - created - skipped}, '
+            f'с ошибками: {skipped}. '
+            f'{elapsed:.2f} с, {total / (elapsed or 1):.0f} строк/с'
+        ))
+
+    @staticmethod
+    def insert(batch):
+        Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    for source, foreign_key, target, counter in (
+        ('favorites.FavoritesRecipes', 'recipes', 'recipes.Recipe',
+         'favorites_count'),
+        ('shopper.ShopRecipes', 'recipes', 'recipes.Recipe', 'in_cart_count'),
+    ):
+        Source = apps.get_model(*source.split('.'))
+        Target = apps.get_model(*target.split('.'))
+        Target.objects.update(**{counter: Coalesce(Subquery(
+            Source.objects.filter(**{foreign_key: OuterRef('pk')})
+            .order_by().values(foreign_key)
+            .annotate(total=Count('pk')).values('total')
+        ), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('favorites', '0001_initial'),
+        ('shopper', '0003_shopingredients'),
+        ('recipes', '0007_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_cart_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
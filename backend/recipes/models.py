@@ -1,9 +1,8 @@
-import secrets
-import string
-
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.expressions import RawSQL, Window
+from django.db.models.functions import RowNumber
 from django.urls import reverse
 
 from backend.constants import (
@@ -18,10 +17,65 @@ from backend.constants import (
     TAG_NAME_MAX_LENGTH,
     TAG_SLUG_MAX_LENGTH
 )
+from backend.db import CounterFieldsMixin
 
 User = get_user_model()
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_relations(self, user):
+        """
+        Аннотирует рецепты флагами is_favorited и is_in_shopping_cart
+        для переданного пользователя одним подзапросом на каждый флаг.
+        """
+        if not user or not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        favorites = Recipe.favorites.field.model
+        shopping_cart = Recipe.in_shopping_cart.field.model
+        return self.annotate(
+            is_favorited=models.Exists(favorites.objects.filter(
+                user=user, recipes=models.OuterRef('pk')
+            )),
+            is_in_shopping_cart=models.Exists(shopping_cart.objects.filter(
+                user=user, recipes=models.OuterRef('pk')
+            )),
+        )
+
+    def latest_per_author(self, author_ids, limit):
+        """
+        Оставляет не более limit последних рецептов каждого автора.
+
+        Рецепты нумеруются оконной функцией ROW_NUMBER в разрезе автора,
+        поэтому выборка для любого числа авторов делается одним запросом.
+        """
+        author_ids = list(author_ids)
+        if not author_ids:
+            return self.none()
+        ranked = Recipe.objects.filter(author_id__in=author_ids).annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=models.F('author_id'),
+                order_by=(
+                    models.F('created_at').desc(), models.F('id').desc()
+                ),
+            )
+        ).order_by().values('id', 'row_number')
+        sql, params = ranked.query.sql_with_params()
+        return self.filter(pk__in=RawSQL(
+            f'SELECT ranked.id FROM ({sql}) AS ranked '
+            'WHERE ranked.row_number <= %s',
+            (*params, limit)
+        )).order_by('-created_at', '-id')
+
+
 class Tag(models.Model):
 
     name = models.CharField(
@@ -63,7 +117,8 @@ class Ingredient(models.Model):
         return f'Ингредиент: {self.name} ({self.measurement_unit})'
 
 
-class Recipe(models.Model):
+class Recipe(CounterFieldsMixin, models.Model):
+    counter_fields = ('favorites_count', 'in_cart_count')
 
     author = models.ForeignKey(
         User,
@@ -75,6 +130,9 @@ class Recipe(models.Model):
     image = models.ImageField(
         'Изображение', upload_to='recipes/', null=True
     )
+    image_variants = models.JSONField(
+        'Копии изображения', default=dict, blank=True, editable=False
+    )
     text = models.TextField('Описание')
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -100,30 +158,41 @@ class Recipe(models.Model):
         max_length=SHORT_LINK_MAX_SIZE, unique=True, null=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    favorites_count = models.PositiveIntegerField(
+        'В избранном', default=0, editable=False
+    )
+    in_cart_count = models.PositiveIntegerField(
+        'В списках покупок', default=0, editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
-        ordering = ('-created_at', 'name')
+        ordering = ('-created_at', '-id')
+        indexes = [
+            models.Index(
+                fields=('-created_at', '-id'), name='recipe_created_at_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-created_at', '-id'),
+                name='recipe_author_created_idx'
+            )
+        ]
 
     def __str__(self):
         return f'Рецепт: {self.name}, Автор: {self.author}'
 
-    def generate_short_url(self):
-        alphabet = string.ascii_lowercase + string.digits
-        while True:
-            short_url = ''.join(secrets.choice(alphabet) for _ in range(6))
-            if not Recipe.objects.filter(short_url=short_url).exists():
-                return short_url
+    def get_short_link(self):
+        """Код короткой ссылки: старый сохранённый или вычисленный из id."""
+        from .shortlinks import encode
 
-    def save(self, *args, **kwargs):
-        if not self.short_url:
-            self.short_url = self.generate_short_url()
-        super().save(*args, **kwargs)
+        return self.short_url or encode(self.pk)
 
     def get_short_url(self, request):
         path = reverse(
-            'recipe-short-link', kwargs={'short_link': self.short_url}
+            'recipe-short-link', kwargs={'short_link': self.get_short_link()}
         )
         return request.build_absolute_uri(path)
 
@@ -0,0 +1,172 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+
+from backend.constants import (
+    INGREDIENT_SEARCH_LIMIT,
+    INGREDIENT_SEARCH_SIMILARITY
+)
+from backend.versions import get_versions
+from .models import Ingredient
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е').strip()
+
+
+def trigrams(value):
+    """Триграммы в духе pg_trgm: каждое слово дополняется пробелами."""
+    result = set()
+    for word in value.split():
+        word = f'  {word} '
+        result.update(word[i:i + 3] for i in range(len(word) - 2))
+    return result
+
+
+class IngredientIndex:
+    """
+    Индекс справочника ингредиентов в памяти процесса.
+
+    Справочник небольшой и меняется редко, поэтому поиск идёт
+    по отсортированным массивам названий и слов и по триграммам,
+    без выборки справочника из базы. Индекс строится при первом
+    обращении. Правки ингредиентов в этом процессе сбрасывают его
+    сигналом, а версию 'ingredients' в базе индекс сверяет не чаще
+    раза в INGREDIENT_INDEX_CHECK_INTERVAL секунд: так изменения из
+    import_csv, seed_data и других процессов gunicorn попадают в поиск
+    без перезапуска, а сам поиск в базу не ходит.
+    INGREDIENT_INDEX_TTL — страховка для правок в обход сигналов Django.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def invalidate(self):
+        self._state = None
+
+    @staticmethod
+    def _is_fresh(state):
+        if state is None:
+            return False
+        now = time.monotonic()
+        ttl = getattr(settings, 'INGREDIENT_INDEX_TTL', None)
+        if ttl and now - state['built_at'] >= ttl:
+            return False
+        interval = getattr(settings, 'INGREDIENT_INDEX_CHECK_INTERVAL', 0)
+        if now - state['checked_at'] < interval:
+            return True
+        if state['version'] != get_versions('ingredients'):
+            return False
+        state['checked_at'] = now
+        return True
+
+    def _build(self):
+        version = get_versions('ingredients')
+        items = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda item: (
+                normalize(item['name']), item['measurement_unit']
+            )
+        )
+        names = [normalize(item['name']) for item in items]
+        words = sorted(
+            (word, position)
+            for position, name in enumerate(names)
+            for word in name.split()[1:]
+        )
+        postings = {}
+        trigram_counts = []
+        for position, name in enumerate(names):
+            grams = trigrams(name)
+            trigram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        built_at = time.monotonic()
+        return {
+            'built_at': built_at,
+            'checked_at': built_at,
+            'version': version,
+            'items': items,
+            'names': names,
+            'words': words,
+            'word_keys': [word for word, _ in words],
+            'postings': postings,
+            'trigram_counts': trigram_counts,
+        }
+
+    def get_state(self):
+        state = self._state
+        if not self._is_fresh(state):
+            with self._lock:
+                state = self._state
+                if not self._is_fresh(state):
+                    state = self._state = self._build()
+        return state
+
+    def all(self):
+        return self.get_state()['items']
+
+    def search(self, query, limit=INGREDIENT_SEARCH_LIMIT):
+        """
+        Ищет ингредиенты по началу названия, затем по началу любого
+        слова в названии, затем по сходству триграмм для опечаток.
+        """
+        query = normalize(query)
+        state = self.get_state()
+        if not query:
+            return state['items'][:limit]
+        found = []
+        seen = set()
+
+        def collect(positions):
+            for position in positions:
+                if len(found) >= limit:
+                    return
+                if position not in seen:
+                    seen.add(position)
+                    found.append(position)
+
+        names = state['names']
+        start = bisect_left(names, query)
+        end = start
+        while end < len(names) and names[end].startswith(query):
+            end += 1
+        collect(range(start, end))
+
+        words, word_keys = state['words'], state['word_keys']
+        start = bisect_left(word_keys, query)
+        end = start
+        while end < len(word_keys) and word_keys[end].startswith(query):
+            end += 1
+        collect(sorted({words[i][1] for i in range(start, end)}))
+
+        if len(found) < limit:
+            collect(self._similar(state, query))
+        return [state['items'][position] for position in found]
+
+    @staticmethod
+    def _similar(state, query):
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return []
+        shared = Counter()
+        for gram in query_trigrams:
+            shared.update(state['postings'].get(gram, ()))
+        counts = state['trigram_counts']
+        scored = []
+        for position, common in shared.items():
+            similarity = common / (
+                len(query_trigrams) + counts[position] - common
+            )
+            if similarity >= INGREDIENT_SEARCH_SIMILARITY:
+                scored.append(
+                    (-similarity, state['names'][position], position)
+                )
+        return [position for *_, position in sorted(scored)]
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,96 @@
+"""
+Короткие ссылки на рецепты.
+
+Код вычисляется из id рецепта: id перемешивается умножением по
+модулю 62 ** SHORT_LINK_LENGTH и записывается в base62. Такое
+отображение взаимно однозначно, поэтому код не нужно ни подбирать,
+ни хранить. Старые шестисимвольные коды из Recipe.short_url
+по-прежнему ищутся в базе.
+
+Найденные коды кешируются в процессе и в общем кеше под версией
+'shortlinks', которую удаление рецепта поднимает в базе: так коды
+удалённых рецептов перестают открываться во всех процессах.
+"""
+import string
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from backend.constants import (
+    SHORT_LINK_CACHE_SIZE,
+    SHORT_LINK_LENGTH,
+    SHORT_LINK_MULTIPLIER,
+    SHORT_LINK_OFFSET
+)
+from backend.versions import bump, get_versions
+from .models import Recipe
+
+ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+BASE = len(ALPHABET)
+MODULUS = BASE ** SHORT_LINK_LENGTH
+INVERSE = pow(SHORT_LINK_MULTIPLIER, -1, MODULUS)
+CACHE_KEY = 'shortlink:{}:{}'
+VERSION_SCOPE = 'shortlinks'
+
+_local_cache = {'version': None, 'codes': {}}
+
+
+def encode(recipe_id):
+    number = (recipe_id * SHORT_LINK_MULTIPLIER + SHORT_LINK_OFFSET) % MODULUS
+    chars = []
+    for _ in range(SHORT_LINK_LENGTH):
+        number, remainder = divmod(number, BASE)
+        chars.append(ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def decode(code):
+    if len(code) != SHORT_LINK_LENGTH:
+        return None
+    number = 0
+    for char in code:
+        position = ALPHABET.find(char)
+        if position < 0:
+            return None
+        number = number * BASE + position
+    return (number - SHORT_LINK_OFFSET) * INVERSE % MODULUS
+
+
+def resolve(code):
+    """
+    Id рецепта по короткому коду или None.
+
+    Сначала проверяется кеш процесса, затем общий кеш и только потом
+    база: соответствие кода рецепту не меняется, пока рецепт существует.
+    """
+    version, = get_versions(VERSION_SCOPE)
+    if _local_cache['version'] != version:
+        _local_cache.update(version=version, codes={})
+    codes = _local_cache['codes']
+    if code in codes:
+        return codes[code]
+    key = CACHE_KEY.format(version, code)
+    recipe_id = cache.get(key)
+    if recipe_id is None:
+        recipe_id = decode(code)
+        lookup = (
+            {'pk': recipe_id} if recipe_id is not None
+            else {'short_url': code}
+        )
+        recipe_id = (
+            Recipe.objects.filter(**lookup).values_list('pk', flat=True)
+            .first()
+        )
+        if recipe_id is None:
+            return None
+        cache.set(key, recipe_id, None)
+    if len(codes) >= SHORT_LINK_CACHE_SIZE:
+        codes.clear()
+    codes[code] = recipe_id
+    return recipe_id
+
+
+def forget(recipe):
+    """Сбрасывает кеши кодов во всех процессах после удаления рецепта."""
+    transaction.on_commit(partial(bump, VERSION_SCOPE))
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend.images import delete_variants, is_stale
+from . import shortlinks, snapshots
+from .models import Ingredient, Recipe, Tag
+from .search import ingredient_index
+from .tasks import build_recipe_image_variants
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(**kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def rebuild_ingredients_snapshot(**kwargs):
+    snapshots.schedule('ingredients')
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def rebuild_tags_snapshot(**kwargs):
+    snapshots.schedule('tags')
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_short_link(instance, **kwargs):
+    shortlinks.forget(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_image_variants(instance, raw, **kwargs):
+    if not raw and is_stale(instance.image, instance.image_variants):
+        build_recipe_image_variants.enqueue(
+            (instance.pk,), key=f'image_variants:{instance.pk}'
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_image_variants(instance, **kwargs):
+    delete_variants(instance.image.storage, instance.image_variants)
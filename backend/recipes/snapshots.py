@@ -0,0 +1,126 @@
+"""
+Статические снимки справочников для раздачи через nginx.
+
+Снимок — JSON-файл с хешем содержимого в имени и его gzip-копия
+рядом, поэтому nginx может отдавать их с gzip_static и вечным
+кешированием. Актуальные имена файлов лежат в manifest.json.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Ingredient, Tag
+
+MANIFEST_NAME = 'manifest.json'
+KEEP_VERSIONS = 3
+
+SNAPSHOTS = {
+    'tags': lambda: list(Tag.objects.values('id', 'name', 'slug')),
+    'ingredients': lambda: list(
+        Ingredient.objects.values('id', 'name', 'measurement_unit')
+    ),
+}
+
+_state = threading.local()
+_manifest_cache = {'mtime': None, 'data': {}}
+
+
+def get_root():
+    return Path(settings.SNAPSHOT_ROOT)
+
+
+def _write_atomic(path, content):
+    temp_path = path.with_name(f'.{path.name}.tmp')
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
+
+
+def read_manifest():
+    path = get_root() / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return {}
+    if _manifest_cache['mtime'] != mtime:
+        try:
+            _manifest_cache['data'] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+        _manifest_cache['mtime'] = mtime
+    return _manifest_cache['data']
+
+
+def build_snapshot(name):
+    """Записывает снимок справочника name и возвращает имя файла."""
+    content = json.dumps(
+        SNAPSHOTS[name](), ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root = get_root()
+    root.mkdir(parents=True, exist_ok=True)
+    filename = f'{name}.{digest}.json'
+    _write_atomic(root / filename, content)
+    _write_atomic(
+        root / f'{filename}.gz', gzip.compress(content, 9, mtime=0)
+    )
+    manifest = dict(read_manifest(), **{name: filename})
+    _write_atomic(root / MANIFEST_NAME, json.dumps(manifest).encode())
+    _remove_old_versions(root, name, filename)
+    return filename
+
+
+def _remove_old_versions(root, name, current):
+    versions = sorted(
+        (path for path in root.glob(f'{name}.*.json')
+         if path.name != current),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for path in versions[KEEP_VERSIONS - 1:]:
+        for stale in (path, path.with_name(f'{path.name}.gz')):
+            stale.unlink(missing_ok=True)
+
+
+def build_all():
+    return [build_snapshot(name) for name in SNAPSHOTS]
+
+
+def get_snapshot_url(name):
+    filename = read_manifest().get(name)
+    if filename is None:
+        return None
+    return f'{settings.SNAPSHOT_URL}{filename}'
+
+
+@contextmanager
+def suspended():
+    """Откладывает пересборку снимков до выхода из блока."""
+    previous = getattr(_state, 'pending', None)
+    _state.pending = set()
+    try:
+        yield
+    finally:
+        pending, _state.pending = _state.pending, previous
+        for name in pending:
+            schedule(name)
+
+
+def schedule(name):
+    """
+    Ставит пересборку снимка name в очередь фоновых задач.
+
+    Пока пересборка ждёт в очереди, повторные вызовы её не дублируют.
+    """
+    from .tasks import build_snapshot as build_snapshot_task
+
+    pending = getattr(_state, 'pending', None)
+    if pending is not None:
+        pending.add(name)
+        return
+    build_snapshot_task.enqueue((name,), key=f'snapshot:{name}')
@@ -0,0 +1,19 @@
+from backend.constants import RECIPE_IMAGE_VARIANTS
+from backend.images import refresh_variants
+from jobs.registry import task
+from . import snapshots
+from .models import Recipe
+
+
+@task
+def build_recipe_image_variants(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is not None:
+        refresh_variants(
+            recipe, 'image', 'image_variants', RECIPE_IMAGE_VARIANTS
+        )
+
+
+@task
+def build_snapshot(name):
+    snapshots.build_snapshot(name)
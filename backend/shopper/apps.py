@@ -5,3 +5,6 @@ class ShopperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shopper'
     verbose_name = 'Список покупок'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from shopper.models import ShopIngredients
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает материализованные списки покупок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, nargs='+', dest='user_ids',
+            help='Id пользователей, по умолчанию все'
+        )
+
+    def handle(self, *args, **options):
+        count = ShopIngredients.objects.rebuild(options['user_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Записано строк списков покупок: {count}')
+        )
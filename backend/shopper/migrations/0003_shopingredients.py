@@ -0,0 +1,57 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_shop_ingredients(apps, schema_editor):
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    ShopIngredients = apps.get_model('shopper', 'ShopIngredients')
+    totals = RecipeIngredient.objects.filter(
+        recipe__in_shopping_cart__isnull=False
+    ).values(
+        'ingredient_id', user_id=models.F('recipe__in_shopping_cart__user')
+    ).annotate(total=models.Sum('amount')).order_by()
+    ShopIngredients.objects.bulk_create(
+        (
+            ShopIngredients(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['total'],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0005_alter_recipe_options'),
+        ('shopper', '0002_alter_shoprecipes_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopIngredients',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(verbose_name='Количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='in_shopping_lists', to='recipes.ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'ингредиент списка покупок',
+                'verbose_name_plural': 'Ингредиенты списков покупок',
+                'ordering': ('user',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shopingredients',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='shop_ingredients_unique'),
+        ),
+        migrations.RunPython(fill_shop_ingredients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Удаляет повторы (user, recipes), оставляя самую раннюю строку,
+    и пересчитывает списки покупок и счётчики затронутых записей.
+    """
+    ShopRecipes = apps.get_model('shopper', 'ShopRecipes')
+    ShopIngredients = apps.get_model('shopper', 'ShopIngredients')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    duplicates = ShopRecipes.objects.values('user_id', 'recipes_id').annotate(
+        keep=models.Min('id'), total=models.Count('id')
+    ).filter(total__gt=1).order_by()
+    user_ids = set()
+    for row in duplicates:
+        ShopRecipes.objects.filter(
+            user_id=row['user_id'], recipes_id=row['recipes_id']
+        ).exclude(id=row['keep']).delete()
+        Recipe.objects.filter(id=row['recipes_id']).update(
+            in_cart_count=models.F('in_cart_count') - (row['total'] - 1)
+        )
+        user_ids.add(row['user_id'])
+    if not user_ids:
+        return
+    ShopIngredients.objects.filter(user_id__in=user_ids).delete()
+    totals = RecipeIngredient.objects.filter(
+        recipe__in_shopping_cart__user_id__in=user_ids
+    ).values(
+        'ingredient_id', user_id=models.F('recipe__in_shopping_cart__user')
+    ).annotate(total=models.Sum('amount')).order_by()
+    ShopIngredients.objects.bulk_create(
+        (
+            ShopIngredients(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['total'],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_counters'),
+        ('shopper', '0003_shopingredients'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='shoprecipes',
+            options={'ordering': ('-id',), 'verbose_name': 'список покупок', 'verbose_name_plural': 'Списки покупок'},
+        ),
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='shoprecipes',
+            constraint=models.UniqueConstraint(fields=('user', 'recipes'), name='shop_recipes_unique'),
+        ),
+    ]
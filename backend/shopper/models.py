@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
-from recipes.models import Recipe
+from recipes.models import Ingredient, Recipe, RecipeIngredient
 
 User = get_user_model()
 
@@ -22,7 +22,170 @@ class ShopRecipes(models.Model):
     class Meta:
         verbose_name = 'список покупок'
         verbose_name_plural = 'Списки покупок'
-        ordering = ('user',)
+        ordering = ('-id',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipes'),
+                name='shop_recipes_unique'
+            )
+        ]
 
     def __str__(self):
         return f'{self.user} - {self.recipes.name}'
+
+
+class ShopIngredientsQuerySet(models.QuerySet):
+    """
+    Поддержка материализованного списка покупок.
+
+    Итоговые количества меняются на разницу, а не пересчитываются
+    по всей корзине пользователя. Разницу переносят обработчики
+    сигналов ShopRecipes и RecipeIngredient (shopper.signals), так
+    что список остаётся верным и после правок через админку или ORM.
+    Вызывать методы напрямую нужно только для bulk_create и
+    bulk_update, которые сигналов не отправляют.
+    """
+
+    def apply_deltas(self, user_ids, deltas):
+        """
+        Прибавляет deltas ({ingredient_id: количество}) к спискам
+        пользователей user_ids. Строки с нулевым итогом удаляются.
+        """
+        deltas = {
+            ingredient_id: amount
+            for ingredient_id, amount in deltas.items() if amount
+        }
+        user_ids = list(user_ids)
+        if not deltas or not user_ids:
+            return
+        items = ShopIngredients.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=deltas
+        )
+        with transaction.atomic():
+            items.update(amount=models.F('amount') + models.Case(
+                *(
+                    models.When(ingredient_id=ingredient_id, then=amount)
+                    for ingredient_id, amount in deltas.items()
+                ),
+                default=0,
+                output_field=models.IntegerField()
+            ))
+            existing = set(items.values_list('user_id', 'ingredient_id'))
+            ShopIngredients.objects.bulk_create(
+                ShopIngredients(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=amount
+                )
+                for user_id in user_ids
+                for ingredient_id, amount in deltas.items()
+                if amount > 0 and (user_id, ingredient_id) not in existing
+            )
+            items.filter(amount__lte=0).delete()
+
+    @staticmethod
+    def get_amounts(recipe):
+        return dict(
+            RecipeIngredient.objects.filter(recipe=recipe)
+            .values_list('ingredient_id', 'amount')
+        )
+
+    def add_recipe(self, user_id, recipe_id):
+        self.apply_deltas((user_id,), self.get_amounts(recipe_id))
+
+    def remove_recipe(self, user_id, recipe_id):
+        self.apply_deltas((user_id,), {
+            ingredient_id: -amount
+            for ingredient_id, amount in self.get_amounts(recipe_id).items()
+        })
+
+    @staticmethod
+    def get_total_amounts(recipe_ids):
+        return dict(
+            RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+            .values('ingredient_id')
+            .annotate(total=models.Sum('amount'))
+            .order_by()
+            .values_list('ingredient_id', 'total')
+        )
+
+    def add_recipes(self, user, recipe_ids):
+        if recipe_ids:
+            self.apply_deltas((user.id,), self.get_total_amounts(recipe_ids))
+
+    def remove_recipes(self, user, recipe_ids):
+        if recipe_ids:
+            self.apply_deltas((user.id,), {
+                ingredient_id: -amount
+                for ingredient_id, amount
+                in self.get_total_amounts(recipe_ids).items()
+            })
+
+    def change_recipe(self, recipe, old_amounts, new_amounts):
+        """Переносит изменение состава рецепта во все корзины с ним."""
+        self.apply_deltas(
+            ShopRecipes.objects.filter(recipes=recipe)
+            .values_list('user_id', flat=True).distinct(),
+            {
+                ingredient_id: (
+                    new_amounts.get(ingredient_id, 0)
+                    - old_amounts.get(ingredient_id, 0)
+                )
+                for ingredient_id in old_amounts.keys() | new_amounts.keys()
+            }
+        )
+
+    def rebuild(self, user_ids=None, batch_size=1000):
+        """Пересчитывает списки покупок заново по ShopRecipes."""
+        carts = {'recipe__in_shopping_cart__isnull': False}
+        items = ShopIngredients.objects.all()
+        if user_ids is not None:
+            carts = {'recipe__in_shopping_cart__user_id__in': user_ids}
+            items = items.filter(user_id__in=user_ids)
+        totals = RecipeIngredient.objects.filter(**carts).values(
+            'ingredient_id', user_id=models.F('recipe__in_shopping_cart__user')
+        ).annotate(total=models.Sum('amount')).order_by()
+        with transaction.atomic():
+            items.delete()
+            return len(ShopIngredients.objects.bulk_create(
+                (
+                    ShopIngredients(
+                        user_id=row['user_id'],
+                        ingredient_id=row['ingredient_id'],
+                        amount=row['total']
+                    )
+                    for row in totals.iterator()
+                ),
+                batch_size=batch_size
+            ))
+
+
+class ShopIngredients(models.Model):
+    """Итоговое количество ингредиента в списке покупок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='shopping_list'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент',
+        related_name='in_shopping_lists'
+    )
+    amount = models.IntegerField('Количество')
+
+    objects = ShopIngredientsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'ингредиент списка покупок'
+        verbose_name_plural = 'Ингредиенты списков покупок'
+        ordering = ('user',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='shop_ingredients_unique'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.ingredient}: {self.amount}'
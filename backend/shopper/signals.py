@@ -0,0 +1,93 @@
+"""
+Перенос изменений корзин и состава рецептов в списки покупок.
+
+Перед сохранением существующей строки запоминается её прежнее
+состояние, чтобы после сохранения применить разницу. При удалении
+рецепта каскадом сигналы приходят по очереди для строк корзин и
+состава; каждый обработчик видит уже удалённые строки и не вычитает
+ингредиенты дважды.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from recipes.models import RecipeIngredient
+from .models import ShopIngredients, ShopRecipes
+
+
+def remember_previous(model, instance, fields):
+    instance._shopping_previous = None
+    if instance.pk is not None:
+        instance._shopping_previous = model.objects.filter(
+            pk=instance.pk
+        ).values(*fields).first()
+
+
+@receiver(pre_save, sender=ShopRecipes)
+def remember_cart_item(instance, raw, **kwargs):
+    if not raw:
+        remember_previous(
+            ShopRecipes, instance, ('user_id', 'recipes_id')
+        )
+
+
+@receiver(post_save, sender=ShopRecipes)
+def cart_item_saved(instance, raw, **kwargs):
+    if raw:
+        return
+    previous = instance._shopping_previous
+    current = {'user_id': instance.user_id, 'recipes_id': instance.recipes_id}
+    if previous == current:
+        return
+    if previous is not None:
+        ShopIngredients.objects.remove_recipe(
+            previous['user_id'], previous['recipes_id']
+        )
+    ShopIngredients.objects.add_recipe(instance.user_id, instance.recipes_id)
+
+
+@receiver(post_delete, sender=ShopRecipes)
+def cart_item_deleted(instance, **kwargs):
+    ShopIngredients.objects.remove_recipe(
+        instance.user_id, instance.recipes_id
+    )
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_recipe_ingredient(instance, raw, **kwargs):
+    if not raw:
+        remember_previous(
+            RecipeIngredient, instance,
+            ('recipe_id', 'ingredient_id', 'amount')
+        )
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved(instance, raw, **kwargs):
+    if raw:
+        return
+    previous = instance._shopping_previous
+    new_amounts = {instance.ingredient_id: instance.amount}
+    if previous is None:
+        ShopIngredients.objects.change_recipe(
+            instance.recipe_id, {}, new_amounts
+        )
+        return
+    old_amounts = {previous['ingredient_id']: previous['amount']}
+    if previous['recipe_id'] == instance.recipe_id:
+        ShopIngredients.objects.change_recipe(
+            instance.recipe_id, old_amounts, new_amounts
+        )
+        return
+    ShopIngredients.objects.change_recipe(
+        previous['recipe_id'], old_amounts, {}
+    )
+    ShopIngredients.objects.change_recipe(
+        instance.recipe_id, {}, new_amounts
+    )
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted(instance, **kwargs):
+    ShopIngredients.objects.change_recipe(
+        instance.recipe_id, {instance.ingredient_id: instance.amount}, {}
+    )
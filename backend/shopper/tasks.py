@@ -0,0 +1,11 @@
+from jobs.registry import task
+from .models import ShopIngredients
+
+
+@task(every=60 * 60 * 24)
+def rebuild_shopping_lists():
+    """
+    Страховка для списков покупок: изменения в обход сигналов
+    (bulk-операции, SQL) исправляются полным пересчётом.
+    """
+    ShopIngredients.objects.rebuild()
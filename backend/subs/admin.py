@@ -1,5 +1,16 @@
 from django.contrib import admin
 
+from backend.db import EstimatedCountPaginator
 from .models import Subscriber
 
-admin.site.register(Subscriber)
+
+class SubscriberAdmin(admin.ModelAdmin):
+    list_display = ('user', 'subscriptions')
+    list_select_related = ('user', 'subscriptions')
+    autocomplete_fields = ('user', 'subscriptions')
+    search_fields = ('user__username', 'subscriptions__username')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+admin.site.register(Subscriber, SubscriberAdmin)
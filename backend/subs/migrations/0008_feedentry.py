@@ -0,0 +1,58 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+FEED_BACKFILL_LIMIT = 50
+
+
+def fill_feeds(apps, schema_editor):
+    Subscriber = apps.get_model('subs', 'Subscriber')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    FeedEntry = apps.get_model('subs', 'FeedEntry')
+    for user_id, author_id in Subscriber.objects.values_list(
+        'user_id', 'subscriptions_id'
+    ).iterator():
+        recipes = Recipe.objects.filter(author_id=author_id).order_by(
+            '-created_at', '-id'
+        ).values_list('id', 'created_at')[:FEED_BACKFILL_LIMIT]
+        FeedEntry.objects.bulk_create(
+            FeedEntry(user_id=user_id, recipe_id=recipe_id, created_at=created_at)
+            for recipe_id, created_at in recipes
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('subs', '0007_alter_subscriber_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(verbose_name='Дата публикации')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='recipes.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Ленты подписок',
+                'ordering': ('-created_at', '-id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='feed_entry_user_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='feed_entry_unique'),
+        ),
+        migrations.RunPython(fill_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subs', '0008_feedentry'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='subscriber',
+            options={'ordering': ('-id',), 'verbose_name': 'подписка', 'verbose_name_plural': 'Подписки'},
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['subscriptions', 'user'], name='subscriber_author_user_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
+from itertools import islice
+
 from django.db import models
 
+from backend.constants import FEED_BACKFILL_LIMIT, FEED_BATCH_SIZE
+from recipes.models import Recipe
 from users.models import Profile
 
 
@@ -20,7 +24,13 @@ class Subscriber(models.Model):
     class Meta:
         verbose_name = 'подписка'
         verbose_name_plural = 'Подписки'
-        ordering = ('user',)
+        ordering = ('-id',)
+        indexes = [
+            models.Index(
+                fields=('subscriptions', 'user'),
+                name='subscriber_author_user_idx'
+            )
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'subscriptions'],
@@ -34,3 +44,92 @@ class Subscriber(models.Model):
 
     def __str__(self):
         return f'{self.user} - {self.subscriptions}'
+
+
+class FeedEntryQuerySet(models.QuerySet):
+    """Наполнение лент подписчиков."""
+
+    def fan_out(self, recipe, batch_size=FEED_BATCH_SIZE):
+        """Кладёт рецепт в ленты всех подписчиков его автора."""
+        user_ids = Subscriber.objects.filter(
+            subscriptions_id=recipe.author_id
+        ).values_list('user_id', flat=True).iterator()
+        while True:
+            batch = list(islice(user_ids, batch_size))
+            if not batch:
+                return
+            FeedEntry.objects.bulk_create(
+                (
+                    FeedEntry(
+                        user_id=user_id,
+                        recipe_id=recipe.id,
+                        created_at=recipe.created_at
+                    )
+                    for user_id in batch
+                ),
+                ignore_conflicts=True
+            )
+
+    def backfill(self, user_id, author_ids, limit=FEED_BACKFILL_LIMIT):
+        """Добавляет в ленту подписчика последние рецепты новых авторов."""
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=user_id, recipe_id=recipe_id, created_at=created_at
+                )
+                for recipe_id, created_at in Recipe.objects.latest_per_author(
+                    author_ids, limit
+                ).values_list('id', 'created_at')
+            ),
+            ignore_conflicts=True
+        )
+
+    def drop_authors(self, user_id, author_ids):
+        """Убирает из ленты подписчика рецепты авторов author_ids."""
+        return self.filter(
+            user_id=user_id, recipe__author_id__in=author_ids
+        ).delete()
+
+
+class FeedEntry(models.Model):
+    """
+    Рецепт во входящей ленте подписчика.
+
+    Дата публикации продублирована из рецепта, чтобы лента читалась
+    диапазоном по индексу (user, -created_at, -id) без соединения
+    с подписками и рецептами.
+    """
+    user = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='feed',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт'
+    )
+    created_at = models.DateTimeField('Дата публикации')
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+        ordering = ('-created_at', '-id')
+        indexes = [
+            models.Index(
+                fields=('user', '-created_at', '-id'),
+                name='feed_entry_user_created_idx'
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='feed_entry_unique'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.recipe_id}'
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Recipe
+from .models import FeedEntry, Subscriber
+from .tasks import fan_out_recipe
+
+
+@receiver(post_save, sender=Recipe)
+def publish_to_feeds(instance, created, raw, **kwargs):
+    if created and not raw:
+        fan_out_recipe.enqueue((instance.pk,), key=f'feed:{instance.pk}')
+
+
+@receiver(post_delete, sender=Subscriber)
+def drop_from_feed(instance, **kwargs):
+    FeedEntry.objects.drop_authors(
+        instance.user_id, (instance.subscriptions_id,)
+    )
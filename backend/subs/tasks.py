@@ -0,0 +1,10 @@
+from jobs.registry import task
+from recipes.models import Recipe
+from .models import FeedEntry
+
+
+@task
+def fan_out_recipe(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is not None:
+        FeedEntry.objects.fan_out(recipe)
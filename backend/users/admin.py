@@ -1,11 +1,23 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from backend.db import EstimatedCountPaginator
+
 User = get_user_model()
 
 
 class ProfileAdmin(admin.ModelAdmin):
     search_fields = ('username', 'email')
+    list_display = (
+        'username',
+        'email',
+        'first_name',
+        'last_name',
+        'recipes_count',
+        'subscribers_count'
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(User, ProfileAdmin)
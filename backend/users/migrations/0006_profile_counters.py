@@ -0,0 +1,43 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    for source, foreign_key, target, counter in (
+        ('recipes.Recipe', 'author', 'users.Profile', 'recipes_count'),
+        ('subs.Subscriber', 'subscriptions', 'users.Profile',
+         'subscribers_count'),
+    ):
+        Source = apps.get_model(*source.split('.'))
+        Target = apps.get_model(*target.split('.'))
+        Target.objects.update(**{counter: Coalesce(Subquery(
+            Source.objects.filter(**{foreign_key: OuterRef('pk')})
+            .order_by().values(foreign_key)
+            .annotate(total=Count('pk')).values('total')
+        ), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_counters'),
+        ('subs', '0008_feedentry'),
+        ('users', '0005_profile_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Рецептов'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='subscribers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчиков'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
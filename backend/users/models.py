@@ -2,15 +2,17 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from backend.constants import MAX_LENGTH_NAME
+from backend.db import CounterFieldsMixin
 
 
-class Profile(AbstractUser):
+class Profile(CounterFieldsMixin, AbstractUser):
     """
     Кастомная модель юзера, переопределяющая необязательные
     поля в обязательные.
 
     Добавлено поле для фотографии профиля.
     """
+    counter_fields = ('recipes_count', 'subscribers_count')
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name')
 
@@ -39,6 +41,15 @@ class Profile(AbstractUser):
         blank=True,
         null=True
     )
+    avatar_variants = models.JSONField(
+        'Копии фотографии', default=dict, blank=True, editable=False
+    )
+    recipes_count = models.PositiveIntegerField(
+        'Рецептов', default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Подписчиков', default=0, editable=False
+    )
 
     class Meta:
         verbose_name = 'пользователь'
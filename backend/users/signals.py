@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend.images import delete_variants, is_stale
+from .models import Profile
+from .tasks import build_avatar_variants
+
+
+@receiver(post_save, sender=Profile)
+def refresh_avatar_variants(instance, raw, **kwargs):
+    if not raw and is_stale(instance.avatar, instance.avatar_variants):
+        build_avatar_variants.enqueue(
+            (instance.pk,), key=f'avatar_variants:{instance.pk}'
+        )
+
+
+@receiver(post_delete, sender=Profile)
+def delete_avatar_variants(instance, **kwargs):
+    delete_variants(instance.avatar.storage, instance.avatar_variants)
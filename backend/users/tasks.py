@@ -0,0 +1,13 @@
+from backend.constants import AVATAR_IMAGE_VARIANTS
+from backend.images import refresh_variants
+from jobs.registry import task
+from .models import Profile
+
+
+@task
+def build_avatar_variants(user_id):
+    user = Profile.objects.filter(pk=user_id).first()
+    if user is not None:
+        refresh_variants(
+            user, 'avatar', 'avatar_variants', AVATAR_IMAGE_VARIANTS
+        )